@@ -2,6 +2,9 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app import database
+from app.page_cache import page_cache
 
 db = SQLAlchemy()
 mail = Mail()
@@ -11,10 +14,22 @@ def create_app():
     
     # Configuración
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    app.config['SQLALCHEMY_DATABASE_URI'] = database.normalize_database_url(os.environ.get(
         'DATABASE_URL', 'sqlite:///portfolio.db'
-    )
+    ))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Motor de BD: PRAGMAs en SQLite, pool de conexiones en PostgreSQL/MySQL (app/database.py)
+    app.config['DB_TUNING'] = os.environ.get('DB_TUNING', 'true').lower() == 'true'
+    app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # Milisegundos
+    app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # Segundos
+    app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(app.config)
     app.config['SESSION_COOKIE_SECURE'] = False  # Set True en producción con HTTPS
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['PERMANENT_SESSION_LIFETIME'] = 2592000  # 30 días
@@ -26,115 +41,97 @@ def create_app():
     app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
     app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@nicolasnorato.com')
+    # Sin servidor SMTP (desarrollo/pruebas): los emails se imprimen en la consola
+    app.config['MAIL_SUPPRESS_SEND'] = os.environ.get('MAIL_SUPPRESS_SEND', 'false').lower() == 'true'
+    
+    # Cola de emails: hilo en segundo plano por worker, o `flask send-mail` si se desactiva
+    app.config['MAIL_OUTBOX_WORKER'] = os.environ.get('MAIL_OUTBOX_WORKER', 'true').lower() == 'true'
+    app.config['MAIL_OUTBOX_INTERVAL'] = int(os.environ.get('MAIL_OUTBOX_INTERVAL', 60))
+    app.config['MAIL_BATCH_SIZE'] = int(os.environ.get('MAIL_BATCH_SIZE', 20))
+    app.config['MAIL_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_MAX_ATTEMPTS', 6))
+    app.config['MAIL_RETRY_BASE'] = int(os.environ.get('MAIL_RETRY_BASE', 60))  # Segundos; se duplica en cada intento
+    
+    # Límite de peticiones por IP ('N/segundos'); 'database' lo comparte entre workers
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATE_LIMIT_STORAGE'] = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    app.config['RATE_LIMIT_CONTACT'] = os.environ.get('RATE_LIMIT_CONTACT', '5/600')
+    app.config['RATE_LIMIT_LOGIN'] = os.environ.get('RATE_LIMIT_LOGIN', '5/300')
+    app.config['CONTACT_DEDUP_WINDOW'] = int(os.environ.get('CONTACT_DEDUP_WINDOW', 3600))  # Segundos
+    
+    # Proxies delante de la app (Render: 1) para obtener la IP real del cliente
+    app.config['PROXY_COUNT'] = int(os.environ.get('PROXY_COUNT', 0))
+    if app.config['PROXY_COUNT']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_COUNT'], x_proto=app.config['PROXY_COUNT'])
+    
+    # Caché de repos de GitHub: 'memory', 'file' (compartido entre workers) o 'database'
+    app.config['GITHUB_CACHE_BACKEND'] = os.environ.get('GITHUB_CACHE_BACKEND', 'file')
+    app.config['GITHUB_CACHE_FILE'] = os.environ.get('GITHUB_CACHE_FILE')
+    # Segundos tras los que las tablas de `flask sync-github` se dan por viejas y se usa la API (0: nunca)
+    app.config['GITHUB_SYNC_MAX_AGE'] = int(os.environ.get('GITHUB_SYNC_MAX_AGE', 86400))
+    
+    # Caché de páginas renderizadas: LRU en memoria y, opcionalmente, un directorio compartido
+    app.config['PAGE_CACHE_SIZE'] = int(os.environ.get('PAGE_CACHE_SIZE', 128))
+    app.config['PAGE_CACHE_DIR'] = os.environ.get('PAGE_CACHE_DIR')
+    
+    # CSS/JS versionados de `flask build-assets`; false: cargar los archivos fuente (desarrollo)
+    app.config['ASSETS_BUNDLED'] = os.environ.get('ASSETS_BUNDLED', 'true').lower() == 'true'
+    
+    # Métricas Prometheus en /metrics (app/metrics.py)
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')  # Compartido por los workers; por defecto instance/metrics
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # Sin token /metrics da 404; con él exige 'Authorization: Bearer <token>'
+    app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))  # Segundos
+    app.config['METRICS_SLOW_REQUEST_MS'] = float(os.environ.get('METRICS_SLOW_REQUEST_MS', 1000))
+    app.config['METRICS_SLOW_SAMPLE_RATE'] = float(os.environ.get('METRICS_SLOW_SAMPLE_RATE', 1.0))  # Fracción a registrar
+    
+    # Compresión gzip/brotli de HTML y JSON (app/compression.py)
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # Bytes
+    app.config['COMPRESS_GZIP_LEVEL'] = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    app.config['COMPRESS_BR_QUALITY'] = int(os.environ.get('COMPRESS_BR_QUALITY', 5))
+    app.config['COMPRESS_CACHE_SIZE'] = int(os.environ.get('COMPRESS_CACHE_SIZE', 256))  # Cuerpos comprimidos en memoria
+    app.config['COMPRESS_MIMETYPES'] = [
+        'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+        'application/json', 'application/manifest+json', 'image/svg+xml',
+    ]
     
     # Inicializar extensiones
     db.init_app(app)
+    database.init_app(app)
     mail.init_app(app)
+    page_cache.init_app(app)
     
-    # Registrar blueprints
-    from app.routes import main_bp
-    app.register_blueprint(main_bp)
+    # Métricas antes que la compresión: sus after_request se ejecutan en orden
+    # inverso, así el tiempo medido incluye comprimir la respuesta
+    from app.metrics import metrics
+    metrics.init_app(app)
     
-    # Crear tablas e inicializar datos
-    with app.app_context():
-        db.create_all()
-        # Inicializar BD si está vacía
-        _initialize_db_if_empty()
+    # Antes que el resto para ejecutarse después de los demás after_request
+    from app.compression import compressor
+    compressor.init_app(app)
     
-    return app
-
-def _initialize_db_if_empty():
-    """Inicializa la BD con datos de ejemplo si está vacía"""
-    from app.models import Skill, Experience, Education
-    
-    # Verificar si ya hay datos
-    if Skill.query.first() is not None:
-        return  # Ya hay datos, no inicializar
-    
-    print('⏳ Base de datos vacía. Inicializando con datos de ejemplo...')
-    
-    # Agregar habilidades
-    skills_data = [
-        # Lenguajes de Programación
-        ('Lenguajes', 'Python', 95),
-        ('Lenguajes', 'C#', 85),
-        ('Lenguajes', 'JavaScript', 80),
-        ('Lenguajes', 'Java', 75),
-        
-        # Desarrollo de Videojuegos
-        ('Videojuegos', 'Unity', 90),
-        ('Videojuegos', 'C# para Juegos', 88),
-        ('Videojuegos', 'Gamedev', 85),
-        
-        # IA e Integración de APIs
-        ('IA & APIs', 'Integración de APIs', 90),
-        ('IA & APIs', 'Inteligencia Artificial', 80),
-        ('IA & APIs', 'ChatGPT API', 85),
-        ('IA & APIs', 'Machine Learning', 75),
-        
-        # Desarrollo Web
-        ('Desarrollo Web', 'Flask', 88),
-        ('Desarrollo Web', 'HTML/CSS', 85),
-        ('Desarrollo Web', 'JavaScript Web', 82),
-        ('Desarrollo Web', 'Responsive Design', 88),
-        
-        # Herramientas
-        ('Herramientas', 'Git', 90),
-        ('Herramientas', 'GitHub', 90),
-        ('Herramientas', 'VS Code', 95),
-        ('Herramientas', 'SQL', 85),
-    ]
+    from app.assets import assets
+    assets.init_app(app)
     
-    for i, (category, name, proficiency) in enumerate(skills_data):
-        skill = Skill(category=category, name=name, proficiency=proficiency, order=i)
-        db.session.add(skill)
-    
-    # Agregar experiencia
-    experiences_data = [
-        {
-            'title': 'Cajero / Atención al Cliente',
-            'company': 'ÉXITO (Los Almacenes)',
-            'location': 'Bucaramanga, Colombia',
-            'start_date': 'Agosto 2025',
-            'end_date': 'Septiembre 2025',
-            'description': 'Atención profesional al cliente, gestión de caja, control de inventario y resolución de problemas. Experiencia que desarrolló mis habilidades de comunicación, paciencia y trabajo bajo presión.'
-        },
-        {
-            'title': 'Operario Multifuncional',
-            'company': 'Cine (Cinematografía)',
-            'location': 'Bucaramanga, Colombia',
-            'start_date': 'Noviembre 2025',
-            'end_date': 'Enero 2026',
-            'description': 'Servicio al cliente, operaciones de cine, mantenimiento de instalaciones y gestión de eventos. Experiencia en ambiente dinámico que fortaleció mi adaptabilidad y capacidad de aprendizaje rápido.'
-        },
-        {
-            'title': 'Estudiante Técnico en Sistemas & Desarrollador',
-            'company': 'UTS + Proyectos Personales',
-            'location': 'Bucaramanga, Colombia',
-            'start_date': '2026 - Presente',
-            'end_date': None,
-            'description': 'Cursando Técnico en Sistemas en UTS mientras desarrollo proyectos personales en Python, Unity y desarrollo web. Integración de APIs de IA y participación activa en comunidades tecnológicas.'
-        },
-    ]
+    from app.mail_outbox import outbox_sender
+    outbox_sender.init_app(app)
     
-    for i, exp in enumerate(experiences_data):
-        experience = Experience(order=i, **exp)
-        db.session.add(experience)
-    
-    # Agregar educación
-    educations_data = [
-        {
-            'degree': 'Técnico en Sistemas',
-            'institution': 'UTS (Unidades Tecnológicas de Santander)',
-            'field': 'Formación Técnica en Sistemas',
-            'year': '2026',
-            'description': 'Formación técnica en desarrollo de sistemas, programación, redes y tecnologías de información. En curso desde enero 2026.'
-        },
-    ]
+    from app.rate_limit import limiter
+    limiter.init_app(app)
+    
+    # Catálogos de traducción compilados una vez; t()/tc() en las plantillas
+    from app import i18n
+    i18n.init_app(app)
     
-    for i, edu in enumerate(educations_data):
-        education = Education(order=i, **edu)
-        db.session.add(education)
+    # Contadores de cambios por tabla (invalida índices y cachés derivados)
+    from app import data_versions  # noqa: F401
     
-    db.session.commit()
-    print('✅ Base de datos inicializada con datos de ejemplo')
+    from app.github_service import GitHubService
+    GitHubService.init_app(app)
+    GitHubService.on_snapshot_change('page_cache', lambda: page_cache.invalidate('projects'))
+    
+    # Registrar blueprints
+    from app.routes import main_bp
+    app.register_blueprint(main_bp)
+    
+    return app
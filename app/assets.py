@@ -0,0 +1,136 @@
+"""
+CSS y JS empaquetados con nombre versionado: `flask build-assets`.
+
+Cada bundle concatena sus archivos fuente, los minifica y se guarda en
+static/dist/ con el hash del contenido en el nombre (app.3f9c2a1b7d4e.js),
+junto a sus variantes precomprimidas (.gz y .br). manifest.json relaciona
+cada bundle con su archivo. Como el nombre cambia con el contenido, se
+sirven con Cache-Control immutable de un año: el navegador los descarga
+una vez por versión y no vuelve a preguntar.
+
+Sin manifest (desarrollo, o ASSETS_BUNDLED=false) las plantillas cargan los
+archivos fuente por separado, como siempre.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import current_app, request, send_from_directory, url_for
+
+# bundle -> archivos fuente (relativos a static/), en orden de carga
+BUNDLES = {
+    'style.css': ('css/style.css',),
+    'head.js': ('js/theme.js', 'js/i18n.js'),  # En <head>: el tema se aplica antes de pintar
+    'app.js': ('js/main.js', 'js/animations.js'),
+}
+
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# Codificaciones precomprimidas, en orden de preferencia
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def _minify(bundle, source):
+    if bundle.endswith('.js'):
+        import rjsmin
+        return rjsmin.jsmin(source)
+    import rcssmin
+    return rcssmin.cssmin(source)
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def build_assets(static_folder):
+    """
+    Genera los bundles en static/dist/ y su manifest (borra los anteriores).
+    
+    Retorna:
+        dict: {bundle: {'file', 'size', 'gzip', 'br'}} con los tamaños en bytes
+    """
+    import brotli
+    
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    os.makedirs(dist)
+    
+    manifest, stats = {}, {}
+    for bundle, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                parts.append(f.read())
+        # ';' entre scripts: un archivo sin punto y coma final no se une con el siguiente
+        separator = '\n;\n' if bundle.endswith('.js') else '\n'
+        data = _minify(bundle, separator.join(parts)).encode('utf-8')
+        
+        stem, ext = os.path.splitext(bundle)
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        compressed = {
+            'gzip': gzip.compress(data, compresslevel=9, mtime=0),
+            'br': brotli.compress(data, quality=11),
+        }
+        _write(os.path.join(dist, filename), data)
+        _write(os.path.join(dist, filename + '.gz'), compressed['gzip'])
+        _write(os.path.join(dist, filename + '.br'), compressed['br'])
+        
+        manifest[bundle] = f"{DIST_DIR}/{filename}"
+        stats[bundle] = {
+            'file': manifest[bundle],
+            'size': len(data),
+            'gzip': len(compressed['gzip']),
+            'br': len(compressed['br']),
+        }
+    
+    with open(os.path.join(dist, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return stats
+
+def send_asset(filename):
+    """Sirve un archivo de static/dist/, precomprimido si el navegador lo acepta"""
+    directory = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0]
+    
+    response = None
+    for encoding, suffix in PRECOMPRESSED:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(directory, filename + suffix)):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(directory, filename, mimetype=mimetype)
+    
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    return response
+
+class Assets:
+    """Manifest de los bundles; asset_urls() en las plantillas"""
+    
+    def __init__(self):
+        self.manifest = {}
+        self.version = ''  # Cambia con cada build: forma parte de los ETags de las páginas
+    
+    def init_app(self, app):
+        self.manifest = {}
+        self.version = ''
+        path = os.path.join(app.static_folder, DIST_DIR, MANIFEST_FILE)
+        if app.config['ASSETS_BUNDLED'] and os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            self.version = hashlib.sha1(json.dumps(self.manifest, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        
+        # Más específica que /static/<path>: tiene prioridad sobre la vista estática de Flask
+        app.add_url_rule(f"{app.static_url_path}/{DIST_DIR}/<path:filename>", 'asset', send_asset)
+        app.jinja_env.globals['asset_urls'] = self.urls
+    
+    def urls(self, bundle):
+        """URLs a incluir en la página para un bundle: el archivo versionado o sus fuentes"""
+        if bundle in self.manifest:
+            return [url_for('static', filename=self.manifest[bundle])]
+        return [url_for('static', filename=source) for source in BUNDLES[bundle]]
+
+assets = Assets()
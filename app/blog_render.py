@@ -0,0 +1,84 @@
+"""
+Renderizado de posts del blog: Markdown -> HTML sanitizado.
+
+El HTML se genera una sola vez al guardar el post y se almacena junto con
+su tabla de contenidos y un hash del contenido. La vista del post solo
+sirve lo guardado. Si cambia el renderer, subir RENDERER_VERSION y ejecutar
+`flask render-posts` para regenerar todos los posts.
+
+markdown y bleach se importan al renderizar, no al arrancar: solo se usan al
+guardar un post, y así no alargan el arranque de cada worker.
+"""
+import hashlib
+from sqlalchemy.orm.attributes import flag_modified
+
+# Cambiarlo invalida el hash de todos los posts (ver `flask render-posts`)
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists', 'nl2br', 'toc']
+
+ALLOWED_TAGS = [
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'em', 'b', 'i', 'del', 'code', 'pre', 'blockquote',
+    'ul', 'ol', 'li', 'a', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+    'div', 'span',
+]
+
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title'],
+    'img': ['src', 'alt', 'title'],
+    'h1': ['id'], 'h2': ['id'], 'h3': ['id'], 'h4': ['id'], 'h5': ['id'], 'h6': ['id'],
+    'div': ['class'],
+    'th': ['align'], 'td': ['align'],
+}
+
+ALLOWED_PROTOCOLS = ['http', 'https', 'mailto']
+
+def content_hash(content):
+    """Hash del contenido y de la versión del renderer"""
+    return hashlib.sha256(f"{RENDERER_VERSION}\n{content}".encode('utf-8')).hexdigest()
+
+def _sanitize(html):
+    import bleach
+    
+    return bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True
+    )
+
+def render_markdown(content):
+    """
+    Retorna:
+        tuple: (html, toc_html) ya sanitizados; toc_html es '' si no hay encabezados
+    """
+    import markdown
+    
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    html = md.convert(content or '')
+    toc_html = md.toc if md.toc_tokens else ''
+    return _sanitize(html), _sanitize(toc_html)
+
+def render_post(post, force=False, touch=True):
+    """
+    Guarda en el post su HTML renderizado si el contenido cambió.
+    
+    Args:
+        touch: False para no cambiar updated_at (re-render sin edición del autor)
+    
+    Retorna:
+        bool: True si se volvió a renderizar
+    """
+    new_hash = content_hash(post.content)
+    if not force and post.content_hash == new_hash and post.rendered_html is not None:
+        return False
+    
+    post.rendered_html, post.toc_html = render_markdown(post.content)
+    post.content_hash = new_hash
+    if not touch and post.id is not None:
+        # Incluir updated_at tal cual en el UPDATE evita que se aplique onupdate
+        flag_modified(post, 'updated_at')
+    return True
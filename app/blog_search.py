@@ -0,0 +1,157 @@
+"""
+Búsqueda de texto completo en el blog.
+
+En SQLite usa una tabla virtual FTS5 (blog_post_fts, rowid = id del post)
+con ranking bm25 y snippets resaltados. En otros motores, o si SQLite no
+trae FTS5, se usa un LIKE por palabra como alternativa.
+
+El índice se mantiene desde las rutas de admin con index_post/remove_post,
+dentro de la misma transacción que el cambio del post.
+"""
+import html
+import re
+from sqlalchemy import or_, text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models import BlogPost
+
+FTS_TABLE = 'blog_post_fts'
+
+# Marcadores temporales para resaltar: se sustituyen por <mark> después de escapar
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_fts_enabled = None
+
+def fts_enabled():
+    """True si la base de datos es SQLite con soporte FTS5"""
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = False
+        if db.engine.dialect.name == 'sqlite':
+            try:
+                with db.engine.connect() as conn:
+                    conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"))
+                    conn.execute(text("DROP TABLE temp.fts5_probe"))
+                _fts_enabled = True
+            except OperationalError:
+                print('⚠️ SQLite sin FTS5: la búsqueda del blog usará LIKE')
+    return _fts_enabled
+
+def ensure_index():
+    """Crea la tabla FTS si no existe y la reconstruye si quedó desincronizada"""
+    if not fts_enabled():
+        return
+    
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(title, summary, content, tokenize='unicode61 remove_diacritics 2')"
+    ))
+    indexed = db.session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+    if indexed != BlogPost.query.count():
+        rebuild_index()
+    db.session.commit()
+
+def rebuild_index():
+    """Vuelve a indexar todos los posts (tras un reseed o una migración)"""
+    if not fts_enabled():
+        return
+    
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    db.session.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, summary, content) "
+        "SELECT id, title, coalesce(summary, ''), content FROM blog_post"
+    ))
+
+def index_post(post):
+    """Indexa (o reindexa) un post. Requiere que el post ya tenga id (flush)"""
+    if not fts_enabled():
+        return
+    
+    remove_post(post.id)
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE}(rowid, title, summary, content) VALUES (:id, :title, :summary, :content)"),
+        {'id': post.id, 'title': post.title, 'summary': post.summary or '', 'content': post.content}
+    )
+
+def remove_post(post_id):
+    """Quita un post del índice"""
+    if not fts_enabled():
+        return
+    
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {'id': post_id})
+
+def _terms(query):
+    return re.findall(r'\w+', query, flags=re.UNICODE)
+
+def _highlight(snippet):
+    """Escapa el HTML del snippet y convierte los marcadores en <mark>"""
+    escaped = html.escape(snippet)
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+def _search_fts(terms, limit, offset):
+    # Cada palabra como prefijo entre comillas: evita inyectar sintaxis FTS5
+    match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"),
+        {'match': match}
+    ).scalar()
+    
+    # bm25 con más peso al título y al resumen que al contenido
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, snippet({FTS_TABLE}, -1, :start, :end, '…', 24) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+            f"ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0) LIMIT :limit OFFSET :offset"
+        ),
+        {'match': match, 'start': _MARK_START, 'end': _MARK_END, 'limit': limit, 'offset': offset}
+    ).all()
+    return total, [(row[0], row[1]) for row in rows]
+
+def _like_snippet(post, terms, width=120):
+    """Fragmento del contenido alrededor de la primera coincidencia"""
+    content = post.content or ''
+    lower = content.lower()
+    positions = [lower.find(term.lower()) for term in terms if term.lower() in lower]
+    start = max(min(positions) - width // 3, 0) if positions else 0
+    snippet = content[start:start + width]
+    
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    snippet = pattern.sub(lambda m: f"{_MARK_START}{m.group(0)}{_MARK_END}", snippet)
+    return ('…' if start else '') + snippet + ('…' if start + width < len(content) else '')
+
+def _search_like(terms, limit, offset):
+    query = BlogPost.query
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(or_(
+            BlogPost.title.ilike(pattern),
+            BlogPost.summary.ilike(pattern),
+            BlogPost.content.ilike(pattern),
+        ))
+    
+    total = query.count()
+    posts = query.order_by(BlogPost.created_at.desc()).limit(limit).offset(offset).all()
+    return total, [(post.id, _like_snippet(post, terms)) for post in posts]
+
+def search_posts(query, page=1, per_page=10):
+    """
+    Busca posts por título, resumen y contenido.
+    
+    Retorna:
+        tuple: (total, [(BlogPost, snippet_html)]) en orden de relevancia
+    """
+    terms = _terms(query)
+    if not terms:
+        return 0, []
+    
+    offset = (page - 1) * per_page
+    if fts_enabled():
+        total, hits = _search_fts(terms, per_page, offset)
+    else:
+        total, hits = _search_like(terms, per_page, offset)
+    
+    posts = {post.id: post for post in BlogPost.query.filter(BlogPost.id.in_([pid for pid, _ in hits]))}
+    results = [(posts[pid], _highlight(snippet)) for pid, snippet in hits if pid in posts]
+    return total, results
@@ -0,0 +1,193 @@
+"""
+Backends de caché para el snapshot de repos de GitHub.
+
+Todos exponen la misma interfaz:
+    load()                     -> dict {'repos', 'fetched_at', 'version', 'stats'} o None
+    save(repos, fetched_at, bump=True, stats=None) -> version (int) del snapshot guardado
+    refresh_lease(blocking=True) -> context manager que indica (bool) si este
+                                    proceso puede refrescar desde GitHub
+
+`stats` son las estadísticas de lenguajes calculadas al guardar (ver
+app/language_stats.py); los snapshots antiguos no las tienen (None).
+
+`bump=False` renueva fetched_at sin cambiar la versión (GitHub respondió
+304 y los datos son los mismos).
+
+- MemoryBackend: solo el proceso actual (comportamiento clásico).
+- FileBackend: archivo JSON compartido por todos los workers de gunicorn.
+  Con fcntl (Linux/macOS) un solo worker refresca a la vez y la versión se
+  incrementa bajo un lock, así dos workers nunca guardan la misma versión
+  con repos distintos.
+- DatabaseBackend: fila en la base de datos de SQLAlchemy.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin locks entre procesos (un solo worker en desarrollo)
+    fcntl = None
+
+@contextmanager
+def _no_lease(blocking=True):
+    """Backends sin coordinación entre procesos: siempre se puede refrescar"""
+    yield True
+
+@contextmanager
+def _file_lock(path, blocking=True):
+    """flock exclusivo sobre un archivo auxiliar; indica si se obtuvo"""
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class MemoryBackend:
+    """Snapshot en memoria del proceso"""
+    
+    def __init__(self):
+        self._snapshot = None
+    
+    def load(self):
+        return self._snapshot
+    
+    def save(self, repos, fetched_at, bump=True, stats=None):
+        version = (self._snapshot['version'] + int(bump)) if self._snapshot else 1
+        self._snapshot = {'repos': repos, 'fetched_at': fetched_at, 'version': version, 'stats': stats}
+        return version
+    
+    def refresh_lease(self, blocking=True):
+        return _no_lease(blocking)
+
+class FileBackend:
+    """
+    Snapshot en un archivo JSON. La escritura es atómica (archivo temporal
+    + os.replace) y la lectura solo vuelve a parsear si cambió el mtime.
+    
+    Dos archivos auxiliares: <path>.lock protege leer la versión y guardar
+    la siguiente; <path>.refresh.lock es el turno para consultar GitHub.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._snapshot = None
+    
+    def load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error leyendo caché {self.path}: {e}")
+                    return self._snapshot
+                data['fetched_at'] = datetime.fromisoformat(data['fetched_at'])
+                self._snapshot = data
+                self._mtime = mtime
+            return self._snapshot
+    
+    def save(self, repos, fetched_at, bump=True, stats=None):
+        with _file_lock(self.path + '.lock'):
+            previous = self.load()
+            version = (previous['version'] + int(bump)) if previous else 1
+            payload = {'repos': repos, 'fetched_at': fetched_at.isoformat(), 'version': version, 'stats': stats}
+            
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.github-cache-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return version
+    
+    def refresh_lease(self, blocking=True):
+        """
+        Turno para refrescar: sin bloquear, False si otro worker ya está
+        consultando GitHub; bloqueando, espera a que termine (y al entrar
+        su snapshot ya está en el archivo).
+        """
+        return _file_lock(self.path + '.refresh.lock', blocking)
+
+class DatabaseBackend:
+    """Snapshot en la tabla cache_entry de la base de datos de la app"""
+    
+    KEY = 'github_repos'
+    
+    def __init__(self, app):
+        self.app = app
+    
+    def load(self):
+        from app import db
+        from app.models import CacheEntry
+        
+        with self.app.app_context():
+            entry = db.session.get(CacheEntry, self.KEY)
+            if entry is None:
+                return None
+            payload = json.loads(entry.payload)
+            if isinstance(payload, list):
+                payload = {'repos': payload}  # Formato anterior: solo la lista de repos
+            return {
+                'repos': payload['repos'],
+                'fetched_at': entry.updated_at,
+                'version': entry.version,
+                'stats': payload.get('stats'),
+            }
+    
+    def save(self, repos, fetched_at, bump=True, stats=None):
+        from app import db
+        from app.models import CacheEntry
+        
+        with self.app.app_context():
+            entry = db.session.get(CacheEntry, self.KEY)
+            if entry is None:
+                entry = CacheEntry(key=self.KEY, version=0)
+                db.session.add(entry)
+            entry.payload = json.dumps({'repos': repos, 'stats': stats}, ensure_ascii=False)
+            entry.updated_at = fetched_at
+            entry.version += int(bump) or int(entry.version == 0)
+            db.session.commit()
+            return entry.version
+    
+    def refresh_lease(self, blocking=True):
+        return _no_lease(blocking)
+
+def create_backend(app):
+    """Crea el backend configurado en GITHUB_CACHE_BACKEND"""
+    name = app.config.get('GITHUB_CACHE_BACKEND', 'memory')
+    
+    if name == 'file':
+        path = app.config.get('GITHUB_CACHE_FILE') or os.path.join(app.instance_path, 'github_repos.json')
+        return FileBackend(path)
+    if name == 'database':
+        return DatabaseBackend(app)
+    if name == 'memory':
+        return MemoryBackend()
+    
+    raise ValueError(f"GITHUB_CACHE_BACKEND desconocido: {name}")
@@ -0,0 +1,138 @@
+"""
+Compresión gzip/brotli de las respuestas de la app.
+
+Se aplica al final de cada petición (after_request) según Accept-Encoding,
+prefiriendo brotli. Solo se comprimen respuestas 200 de los tipos de
+COMPRESS_MIMETYPES (HTML, JSON, CSS, JS...) a partir de COMPRESS_MIN_SIZE
+bytes; por debajo la cabecera gzip/brotli y la CPU no compensan.
+
+- Las respuestas en streaming (sin Content-Length) se comprimen por trozos
+  sin cargarlas en memoria.
+- Las respuestas cacheables (con ETag) guardan su cuerpo comprimido en un
+  LRU por (ETag, codificación): una página que se sirve mil veces se
+  comprime una sola. El ETag de conditional() ya identifica el contenido.
+- Lo que ya viene comprimido (bundles de app/assets.py) no se toca.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Sin el paquete Brotli solo se ofrece gzip
+    brotli = None
+
+class Compressor:
+    """after_request que comprime las respuestas; una instancia por proceso"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.mimetypes = set()
+        self.min_size = 500
+        self.gzip_level = 6
+        self.br_quality = 5
+        self.cache_size = 256
+        self._cache = OrderedDict()  # (etag, longitud, codificación) -> cuerpo comprimido
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config['COMPRESS_ENABLED']
+        self.mimetypes = set(config['COMPRESS_MIMETYPES'])
+        self.min_size = config['COMPRESS_MIN_SIZE']
+        self.gzip_level = config['COMPRESS_GZIP_LEVEL']
+        self.br_quality = config['COMPRESS_BR_QUALITY']
+        self.cache_size = config['COMPRESS_CACHE_SIZE']
+        if self.enabled:
+            app.after_request(self.after_request)
+    
+    def encodings(self):
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+    
+    def after_request(self, response):
+        if (response.status_code != 200
+                or response.mimetype not in self.mimetypes
+                or 'Content-Encoding' in response.headers
+                or 'Content-Range' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        
+        # La representación depende de Accept-Encoding aunque esta vez no se comprima
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings())
+        if encoding is None:
+            return response
+        
+        if response.is_streamed and response.content_length is None:
+            self._compress_stream(response, encoding)
+        else:
+            response.direct_passthrough = False  # Archivos de send_file: leerlos para comprimir
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(self._compressed_body(response, body, encoding))
+        
+        response.headers['Content-Encoding'] = encoding
+        # Los bytes ya no son los del ETag original: pasa a ser débil
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    def _compressed_body(self, response, body, encoding):
+        """Cuerpo comprimido, reutilizando el del LRU si la respuesta es cacheable"""
+        etag, _ = response.get_etag()
+        cacheable = etag and self.cache_size and 'no-store' not in response.headers.get('Cache-Control', '')
+        key = (etag, len(body), encoding)
+        if cacheable:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    return cached
+        
+        if encoding == 'br':
+            data = brotli.compress(body, quality=self.br_quality)
+        else:
+            data = gzip.compress(body, compresslevel=self.gzip_level)
+        
+        if cacheable:
+            with self._lock:
+                self._cache[key] = data
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return data
+    
+    def _compress_stream(self, response, encoding):
+        """Sustituye el iterable de la respuesta por uno que comprime cada trozo"""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.br_quality)
+            compress, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            compress, finish = compressor.compress, compressor.flush
+        
+        original = response.response
+        chunks = response.iter_encoded()
+        
+        def generate():
+            try:
+                for chunk in chunks:
+                    data = compress(chunk)
+                    if data:
+                        yield data
+                yield finish()
+            finally:
+                if hasattr(original, 'close'):
+                    original.close()
+        
+        response.response = generate()
+        response.headers.pop('Content-Length', None)
+    
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+compressor = Compressor()
@@ -0,0 +1,58 @@
+"""
+Contadores de cambios por tabla.
+
+Cada flush que inserta, modifica o borra filas incrementa la versión de su
+tabla en data_version, dentro de la misma transacción. Así cualquier worker
+puede saber con una consulta mínima si los datos cambiaron y reconstruir
+sus índices o cachés derivados.
+
+Las operaciones masivas que no pasan por el ORM (query.update, inserts de
+core) deben llamar a bump_versions() explícitamente.
+"""
+from datetime import datetime
+from sqlalchemy import event, insert, select, update
+from app import db
+from app.models import DataVersion
+
+def get_versions(*names):
+    """
+    Retorna:
+        dict: {tabla: versión} (0 si la tabla nunca cambió)
+    """
+    rows = db.session.execute(
+        select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names))
+    ).all()
+    versions = dict.fromkeys(names, 0)
+    versions.update(rows)
+    return versions
+
+def get_version(name):
+    """Versión actual de una tabla (0 si nunca cambió)"""
+    return get_versions(name)[name]
+
+def bump_versions(connection, names):
+    """Incrementa la versión de cada tabla usando la conexión de la transacción en curso"""
+    now = datetime.utcnow()
+    table = DataVersion.__table__
+    for name in sorted(names):
+        result = connection.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1, updated_at=now))
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    """Registra qué tablas cambió este flush"""
+    names = set()
+    for obj in list(session.new) + list(session.deleted):
+        names.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            names.add(obj.__table__.name)
+    
+    names.discard(DataVersion.__tablename__)
+    if names:
+        bump_versions(session.connection(), names)
@@ -0,0 +1,70 @@
+"""
+Configuración del motor de base de datos según el entorno.
+
+SQLite (valor por defecto) ejecuta estos PRAGMAs en cada conexión nueva:
+- journal_mode=WAL: las lecturas no esperan a las escrituras (y viceversa)
+- synchronous=NORMAL: con WAL es seguro y evita un fsync en cada commit
+- busy_timeout: espera el lock de escritura en vez de fallar con
+  "database is locked" cuando dos workers escriben a la vez
+- mmap_size: lee la base de datos por memoria mapeada
+
+En servidores (PostgreSQL, MySQL) se configura el pool de conexiones:
+tamaño, overflow, reciclado y pre_ping (descarta conexiones cortadas por el
+servidor o por un proxy antes de usarlas).
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def normalize_database_url(url):
+    """'postgres://' (Heroku y algunos hostings) no lo acepta SQLAlchemy 1.4+"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS para la URI configurada"""
+    if not config['DB_TUNING'] or is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return {}
+    
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': True,
+    }
+
+def sqlite_pragmas(config):
+    """PRAGMAs que se aplican a cada conexión SQLite nueva"""
+    return [
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+    ]
+
+def configure_engine(engine, pragmas):
+    """Registra los PRAGMAs en el evento connect del motor (solo SQLite)"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+def init_app(app):
+    """Registra los PRAGMAs de SQLite en el motor de la app (después de db.init_app)"""
+    from app import db
+    
+    config = app.config
+    if config['DB_TUNING'] and is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        with app.app_context():
+            configure_engine(db.engine, sqlite_pragmas(config))
@@ -1,128 +1,682 @@
 import requests
+from app.cache_backends import MemoryBackend, create_backend
+from app.language_stats import compute_language_stats, language_percentages
+from app.http_client import HttpClient
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 import os
+import threading
+import time
+
+# Repos públicos del usuario con sus lenguajes (bytes), como /users/<usuario>/repos
+# con sort=updated y type=owner más un /languages por repo
+REPOS_QUERY = """
+query($login: String!, $after: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $after, privacy: PUBLIC, ownerAffiliations: OWNER,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        name
+        description
+        url
+        stargazerCount
+        updatedAt
+        pushedAt
+        primaryLanguage { name }
+        languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+def _repo_from_graphql(node):
+    """Nodo Repository de GraphQL -> repo con los campos de la API REST"""
+    return {
+        'id': node['databaseId'],
+        'name': node['name'],
+        'description': node['description'],
+        'html_url': node['url'],
+        'language': (node['primaryLanguage'] or {}).get('name'),
+        'stargazers_count': node['stargazerCount'],
+        'updated_at': node['updatedAt'],
+        'pushed_at': node['pushedAt'],
+        'language_bytes': {edge['node']['name']: edge['size'] for edge in node['languages']['edges']},
+    }
 
 class GitHubService:
     """
     Servicio para obtener repositorios de GitHub.
-    Usa caché para evitar saturar la API (60 requests/hora sin token).
+    Usa caché y peticiones condicionales (ETag) para evitar saturar la API
+    (60 requests/hora sin token, 5000 con GITHUB_TOKEN).
     """
     
-    # Variables de clase para cacheo
+    # Variables de clase para cacheo (copia local del snapshot compartido)
     _cached_repos = None
     _cache_time = None
-    _cache_duration = timedelta(seconds=5)  # Cachea 5 segundos
+    _cache_version = None
+    _cached_stats = None  # Estadísticas de lenguajes del snapshot (ver app/language_stats.py)
+    _backend = MemoryBackend()  # Se reemplaza en init_app según GITHUB_CACHE_BACKEND
+    _snapshot_listeners = {}  # {nombre: función} a llamar cuando cambian los datos
+    _cache_duration = timedelta(seconds=int(os.environ.get('GITHUB_CACHE_TTL', 300)))  # TTL blando
+    _cache_hard_duration = timedelta(seconds=int(os.environ.get('GITHUB_CACHE_HARD_TTL', 86400)))  # TTL duro
+    _refresh_lock = threading.Lock()  # Un solo refresco en curso por proceso
+    # Protege el snapshot local: con hilos (gthread) un hilo que adopta el del
+    # backend no debe pisar uno más nuevo que otro acaba de guardar
+    _state_lock = threading.RLock()
+    
+    # Stale-while-revalidate: servir el snapshot y refrescar en segundo plano
+    STALE_WHILE_REVALIDATE = os.environ.get('GITHUB_STALE_WHILE_REVALIDATE', 'true').lower() != 'false'
+    
+    # Circuit breaker: tras varios fallos seguidos, dejar de llamar a GitHub un rato
+    CIRCUIT_THRESHOLD = 3
+    CIRCUIT_COOLDOWN = timedelta(seconds=int(os.environ.get('GITHUB_CIRCUIT_COOLDOWN', 300)))
+    _failures = 0
+    _circuit_open_until = None
     
     GITHUB_USERNAME = "NNorato123"  # Tu usuario de GitHub
-    GITHUB_API_URL = f"https://api.github.com/users/{GITHUB_USERNAME}/repos"
+    # Raíz de la API (GitHub Enterprise o el servidor falso de benchmarks/fake_github.py)
+    GITHUB_API_ROOT = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+    GITHUB_API_URL = f"{GITHUB_API_ROOT}/users/{GITHUB_USERNAME}/repos"
+    GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')  # Opcional: sube el límite a 5000 requests/hora
+    # graphql: con token, repos y lenguajes en una consulta por cada 100 repos
+    # (la API GraphQL exige token); rest: la lista y un /languages por repo
+    GITHUB_API_MODE = os.environ.get('GITHUB_API_MODE', 'graphql').lower()
+    GITHUB_GRAPHQL_URL = f"{GITHUB_API_ROOT}/graphql"
+    
+    # Peticiones condicionales: {url: {'etag', 'last_modified', 'data'}}
+    _validators = {}
+    
+    # Límite de la API según las cabeceras X-RateLimit-* de la última respuesta
+    _rate_remaining = None
+    _rate_reset = None  # Epoch (segundos) en que se renueva la cuota
+    RATE_LIMIT_RESERVE = int(os.environ.get('GITHUB_RATE_LIMIT_RESERVE', 5))
+    
+    # Consultas de lenguajes en paralelo (una por repo)
+    MAX_WORKERS = int(os.environ.get('GITHUB_MAX_WORKERS', 8))
+    REFRESH_DEADLINE = float(os.environ.get('GITHUB_REFRESH_DEADLINE', 10))  # Segundos por refresco
+    
+    # Cliente HTTP del proceso: conexiones keep-alive (una por hilo del pool), reintentos en 5xx
+    _http = HttpClient(
+        'github',
+        pool_size=MAX_WORKERS,
+        connect_timeout=float(os.environ.get('GITHUB_CONNECT_TIMEOUT', 3.05)),
+        read_timeout=float(os.environ.get('GITHUB_READ_TIMEOUT', 5)),
+        retries=int(os.environ.get('GITHUB_RETRIES', 2)),
+    )
     
     @classmethod
-    def get_repo_languages(cls, repo_url):
+    def init_app(cls, app):
+        """Configura el backend de caché compartido entre workers"""
+        cls._backend = create_backend(app)
+        cls._cache_version = None
+    
+    @classmethod
+    def on_snapshot_change(cls, name, callback):
         """
-        Obtiene todos los lenguajes de un repositorio y sus porcentajes.
+        Registra una función sin argumentos que se llama cuando cambia el snapshot.
+        
+        Registrar otra con el mismo nombre la reemplaza: cada create_app()
+        (CLI, benchmarks) vuelve a registrar la suya sin acumular duplicados.
+        """
+        cls._snapshot_listeners[name] = callback
+    
+    @classmethod
+    def snapshot_version(cls):
+        """Versión del snapshot actual (cambia cada vez que cambian los datos)"""
+        return cls._cache_version
+    
+    @classmethod
+    def _load_shared(cls):
+        """Adopta el snapshot del backend si otro worker guardó uno más nuevo"""
+        try:
+            snapshot = cls._backend.load()
+        except Exception as e:
+            print(f"Error leyendo caché compartido de GitHub: {e}")
+            return
+        
+        if snapshot is None:
+            return
+        with cls._state_lock:
+            if cls._cache_time is None or snapshot['fetched_at'] > cls._cache_time:
+                # Snapshots guardados antes de que existieran las estadísticas
+                cls._cached_stats = snapshot.get('stats') or compute_language_stats(snapshot['repos'])
+                cls._cached_repos = snapshot['repos']
+                cls._cache_time = snapshot['fetched_at']
+                cls._cache_version = snapshot['version']
+    
+    @classmethod
+    def _store(cls, repos, changed=True):
+        """Guarda el snapshot en local y en el backend compartido"""
+        with cls._state_lock:
+            if changed or cls._cached_stats is None:
+                cls._cached_stats = compute_language_stats(repos)
+            cls._cached_repos = repos
+            cls._cache_time = datetime.now()
+            try:
+                cls._cache_version = cls._backend.save(repos, cls._cache_time, bump=changed, stats=cls._cached_stats)
+            except Exception as e:
+                print(f"Error guardando caché compartido de GitHub: {e}")
+                if changed or cls._cache_version is None:
+                    cls._cache_version = (cls._cache_version or 0) + 1
+        
+        if changed:
+            for callback in list(cls._snapshot_listeners.values()):
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error notificando cambio del snapshot de GitHub: {e}")
+    
+    @classmethod
+    def _headers(cls, url):
+        """Cabeceras para GitHub: token opcional y validadores de caché"""
+        headers = {'Accept': 'application/vnd.github+json'}
+        if cls.GITHUB_TOKEN:
+            headers['Authorization'] = f"Bearer {cls.GITHUB_TOKEN}"
+        
+        cached = cls._validators.get(url)
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+    
+    @classmethod
+    def _track_rate_limit(cls, response):
+        """Guarda la cuota restante que informa GitHub"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None:
+            cls._rate_remaining = int(remaining)
+        if reset is not None:
+            cls._rate_reset = int(reset)
+    
+    @classmethod
+    def _quota_allows(cls, calls):
+        """
+        True si quedan suficientes requests para `calls` llamadas más la
+        reserva. Sin datos de cuota, o pasado el reset, se asume que sí.
+        """
+        if cls._rate_remaining is None or cls._rate_reset is None:
+            return True
+        if time.time() >= cls._rate_reset:
+            return True
+        return cls._rate_remaining - calls >= cls.RATE_LIMIT_RESERVE
+    
+    @classmethod
+    def use_graphql(cls):
+        """True si los refrescos usan la API GraphQL (modo graphql y token configurado)"""
+        return cls.GITHUB_API_MODE == 'graphql' and bool(cls.GITHUB_TOKEN)
+    
+    @classmethod
+    def _get_json(cls, url, params=None, budget=None):
+        """
+        GET condicional a la API de GitHub.
+        
+        Envía el ETag/Last-Modified de la última respuesta; un 304 reutiliza
+        el JSON ya parseado sin descargarlo de nuevo. `budget` es el plazo
+        total en segundos, reintentos incluidos.
         
         Retorna:
-            dict: {language: percentage} o {}
+            tuple: (data, not_modified), o (None, False) si GitHub no respondió 200/304
+        """
+        key = requests.Request('GET', url, params=params).prepare().url
+        response = cls._http.get(url, budget=budget, params=params, headers=cls._headers(key))
+        cls._track_rate_limit(response)
+        
+        if response.status_code == 304 and key in cls._validators:
+            return cls._validators[key]['data'], True
+        
+        if response.status_code != 200:
+            print(f"GitHub API respondió {response.status_code} para {url}")
+            return None, False
+        
+        data = response.json()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            cls._validators[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'data': data,
+            }
+        return data, False
+    
+    @classmethod
+    def _post_graphql(cls, query, variables, budget=None):
+        """
+        Consulta a la API GraphQL de GitHub.
+        
+        Retorna:
+            dict: El campo 'data' de la respuesta, o None si GitHub respondió
+                  con error (HTTP o errores de GraphQL)
+        """
+        headers = {'Authorization': f"Bearer {cls.GITHUB_TOKEN}"}
+        response = cls._http.post(
+            cls.GITHUB_GRAPHQL_URL,
+            budget=budget,
+            json={'query': query, 'variables': variables},
+            headers=headers
+        )
+        
+        if response.status_code != 200:
+            print(f"GitHub GraphQL respondió {response.status_code}")
+            return None
+        
+        payload = response.json()
+        if payload.get('errors') or not payload.get('data'):
+            messages = '; '.join(error.get('message', '?') for error in payload.get('errors') or [])
+            print(f"GitHub GraphQL respondió con errores: {messages or 'sin datos'}")
+            return None
+        return payload['data']
+    
+    @classmethod
+    def get_repo_language_bytes(cls, repo_url, budget=None):
+        """
+        Obtiene los bytes de código por lenguaje de un repositorio.
+        `budget`: plazo total en segundos (None: solo los timeouts del cliente).
+        
+        Retorna:
+            dict: {language: bytes}, o None si GitHub no respondió
         """
         try:
             # Construir URL para obtener idiomas
             languages_url = f"{repo_url}/languages"
-            response = requests.get(languages_url, timeout=5)
+            languages_data, _ = cls._get_json(languages_url, budget=budget)
+            return languages_data
+        
+        except requests.exceptions.RequestException as e:
+            print(f"Error obteniendo lenguajes de {repo_url}: {e}")
+            return None
+    
+    # {language: bytes} -> {language: percentage}
+    language_percentages = staticmethod(language_percentages)
+    
+    @classmethod
+    def get_repo_languages(cls, repo_url, budget=None):
+        """
+        Obtiene todos los lenguajes de un repositorio y sus porcentajes.
+        
+        Retorna:
+            dict: {language: percentage} o {}
+        """
+        return cls.language_percentages(cls.get_repo_language_bytes(repo_url, budget))
+    
+    @classmethod
+    def _fetch_languages(cls, repos_data, deadline, fetch=None):
+        """
+        Consulta /languages de cada repo en un pool de hilos acotado.
+        
+        Todas las consultas comparten un mismo plazo (deadline); los repos
+        que no respondan a tiempo quedan fuera del resultado.
+        
+        Args:
+            fetch: función (repo_url, budget) a usar; por defecto get_repo_languages
+        
+        Retorna:
+            dict: {repo_id: resultado de fetch}
+        """
+        fetch = fetch or cls.get_repo_languages
+        if not repos_data:
+            return {}
+        
+        remaining = max(deadline - time.monotonic(), 0)
+        workers = max(1, min(cls.MAX_WORKERS, len(repos_data)))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(fetch, repo['url'], remaining): repo['id']
+                for repo in repos_data
+            }
+            done, not_done = wait(futures, timeout=remaining)
+            
+            if not_done:
+                print(f"Plazo agotado: {len(not_done)} repos sin lenguajes")
             
-            if response.status_code == 200:
-                languages_data = response.json()
+            return {futures[future]: future.result() for future in done}
+        finally:
+            # No esperar a los hilos que sigan bloqueados en la red
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @classmethod
+    def list_repos(cls, deadline=None):
+        """
+        Lista cruda de repos del usuario (una sola llamada, condicional).
+        
+        Retorna:
+            tuple: (repos_data, not_modified) como en _get_json
+        """
+        return cls._get_json(
+            cls.GITHUB_API_URL,
+            params={
+                'sort': 'updated',  # Ordena por actualización (más recientes primero)
+                'per_page': 100,    # Obtiene hasta 100 repos
+                'type': 'owner'     # Solo repos que te pertenecen (no forks)
+            },
+            budget=(deadline - time.monotonic()) if deadline is not None else cls.REFRESH_DEADLINE
+        )
+    
+    @classmethod
+    def list_repos_graphql(cls, deadline=None):
+        """
+        Repos del usuario con sus lenguajes vía GraphQL, paginando de 100 en 100.
+        
+        Cada repo tiene la forma de la API REST (id, name, html_url,
+        stargazers_count...) más 'language_bytes' ({lenguaje: bytes}), así que
+        sirve donde se usa list_repos() sin consultar /languages.
+        
+        Retorna:
+            list: Repos en el orden de la API REST, o None si GitHub falló
+        """
+        if deadline is None:
+            deadline = time.monotonic() + cls.REFRESH_DEADLINE
+        
+        repos, cursor = [], None
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print("Plazo agotado consultando GitHub GraphQL")
+                    return None
                 
-                if not languages_data:
-                    return {}
+                data = cls._post_graphql(
+                    REPOS_QUERY,
+                    {'login': cls.GITHUB_USERNAME, 'after': cursor},
+                    budget=remaining
+                )
+                if data is None or data.get('user') is None:
+                    return None
                 
-                # Calcular total de bytes
-                total_bytes = sum(languages_data.values())
+                page = data['user']['repositories']
+                repos.extend(_repo_from_graphql(node) for node in page['nodes'])
+                if not page['pageInfo']['hasNextPage']:
+                    return repos
+                cursor = page['pageInfo']['endCursor']
+        
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"Error consultando GitHub GraphQL: {e}")
+            return None
+    
+    @classmethod
+    def _format_repo(cls, repo, language_bytes, previous_bytes=None):
+        """
+        Repo de la API (forma REST) -> formato de get_repos().
+        
+        language_bytes=None significa que /languages no respondió: el repo
+        queda marcado con 'languages_pending' y se reintenta en el próximo
+        refresco; mientras tanto usa previous_bytes (los del snapshot anterior).
+        """
+        pending = language_bytes is None
+        if pending:
+            language_bytes = previous_bytes
+        
+        # Obtener todos los lenguajes del repositorio
+        languages = cls.language_percentages(language_bytes)
+        
+        # El lenguaje principal es el primero o "No especificado"
+        primary_language = repo['language'] or 'No especificado'
+        
+        # Obtener lista de todos los lenguajes
+        all_languages = list(languages.keys()) if languages else [primary_language]
+        
+        formatted = {
+            'id': repo['id'],
+            'name': repo['name'],
+            'description': repo['description'] or 'Sin descripción',
+            'url': repo['html_url'],
+            'language': primary_language,
+            'languages': languages,  # Todos los lenguajes con porcentajes
+            'language_bytes': language_bytes or {},  # Para las estadísticas del portfolio
+            'all_languages_list': all_languages,  # Lista de todos los lenguajes
+            'stars': repo['stargazers_count'],
+            'updated_at': repo['updated_at'],
+            'pushed_at': repo.get('pushed_at'),
+            'image_url': None,  # GitHub no proporciona imagen
+            'github_url': repo['html_url'],
+            'featured': False,  # Podrías marcar algunos como destacados
+        }
+        if pending:
+            formatted['languages_pending'] = True
+        return formatted
+    
+    @classmethod
+    def _fetch_repos(cls):
+        """
+        Descarga y formatea los repos desde la API de GitHub (sin caché).
+        
+        Con GraphQL disponible es una consulta por cada 100 repos; si falla se
+        recurre a la API REST en el mismo refresco.
+        
+        Retorna:
+            list: Lista de repos formateados, o None si GitHub falló
+        """
+        deadline = time.monotonic() + cls.REFRESH_DEADLINE
+        if cls.use_graphql():
+            repos_data = cls.list_repos_graphql(deadline)
+            if repos_data is not None:
+                repos = [cls._format_repo(repo, repo['language_bytes']) for repo in repos_data]
+                # GraphQL no tiene 304: sin cambios se conserva el snapshot (y su versión)
+                if repos == cls._cached_repos:
+                    return cls._cached_repos
+                return repos
+            print("GitHub GraphQL no disponible, se usa la API REST")
+        return cls._fetch_repos_rest(deadline)
+    
+    @classmethod
+    def _fetch_repos_rest(cls, deadline):
+        """Lista por REST más una consulta /languages por repo, en paralelo"""
+        try:
+            repos_data, not_modified = cls.list_repos(deadline)
+            
+            if repos_data is None:
+                return None
+            
+            cached = {repo['id']: repo for repo in cls._cached_repos or []}
+            if not_modified and cls._cached_repos is not None:
+                # Lista sin cambios (304): pushed_at/updated_at tampoco cambiaron,
+                # solo faltan los lenguajes que no llegaron en refrescos anteriores
+                pending = [
+                    repo for repo in repos_data
+                    if repo['id'] not in cached or cached[repo['id']].get('languages_pending')
+                ]
+                if not pending:
+                    return cls._cached_repos
                 
-                # Calcular porcentajes
-                language_percentages = {}
-                for lang, bytes_count in languages_data.items():
-                    percentage = round((bytes_count / total_bytes) * 100, 1)
-                    language_percentages[lang] = percentage
+                fetched = cls._fetch_languages(pending, deadline, fetch=cls.get_repo_language_bytes)
+                if all(fetched.get(repo['id']) is None for repo in pending):
+                    return cls._cached_repos
                 
-                return language_percentages
+                pending_ids = {repo['id'] for repo in pending}
+                bytes_by_repo = {
+                    repo_id: repo['language_bytes']
+                    for repo_id, repo in cached.items() if repo_id not in pending_ids
+                }
+                bytes_by_repo.update(fetched)
             else:
-                return {}
-                
+                # Obtener los bytes por lenguaje de todos los repos en paralelo
+                bytes_by_repo = cls._fetch_languages(repos_data, deadline, fetch=cls.get_repo_language_bytes)
+            
+            # Formatear los repos; los que se quedaron sin /languages (plazo
+            # agotado) conservan los lenguajes que ya se conocían
+            repos = [
+                cls._format_repo(
+                    repo,
+                    bytes_by_repo.get(repo['id']),
+                    previous_bytes=cached.get(repo['id'], {}).get('language_bytes') or None,
+                )
+                for repo in repos_data
+            ]
+            # Un 200 con los mismos datos (p. ej. un worker recién arrancado, sin
+            # validadores) conserva el snapshot y su versión, como GraphQL
+            if repos == cls._cached_repos:
+                return cls._cached_repos
+            return repos
+        
         except requests.exceptions.RequestException as e:
-            print(f"Error obteniendo lenguajes de {repo_url}: {e}")
-            return {}
+            print(f"Error conectando a GitHub API: {e}")
+            return None
     
     @classmethod
-    def get_repos(cls):
+    def _circuit_is_open(cls):
+        """True si GitHub falló seguido y estamos en periodo de espera"""
+        return cls._circuit_open_until is not None and datetime.now() < cls._circuit_open_until
+    
+    @classmethod
+    def _record_failure(cls):
+        """Cuenta un fallo y abre el circuito al superar el umbral"""
+        cls._failures += 1
+        if cls._failures >= cls.CIRCUIT_THRESHOLD:
+            cls._circuit_open_until = datetime.now() + cls.CIRCUIT_COOLDOWN
+            print(f"GitHub no disponible: circuito abierto por {cls.CIRCUIT_COOLDOWN}")
+    
+    @classmethod
+    def refresh(cls, blocking=True):
         """
-        Obtiene los repositorios de GitHub con caché.
+        Refresca el caché desde GitHub. Solo un refresco a la vez por proceso
+        y, con el backend de archivo, entre todos los workers.
+        
+        Con blocking=False, si ya hay un refresco en curso no hace nada.
+        Con blocking=True espera al que esté en curso y usa su resultado.
+        Si GitHub falla (o el circuito está abierto) conserva el último
+        snapshot bueno.
         
         Retorna:
-            list: Lista de diccionarios con info de cada repo
+            list: Los repos en caché tras el refresco (o [] si nunca hubo)
         """
-        # Si el caché está fresco, devolverlo
-        if cls._cached_repos is not None and cls._cache_time is not None:
-            if datetime.now() - cls._cache_time < cls._cache_duration:
-                return cls._cached_repos
+        if not cls._refresh_lock.acquire(blocking=blocking):
+            return cls._cached_repos or []
         
-        # Si no, obtener de GitHub
         try:
-            response = requests.get(
-                cls.GITHUB_API_URL,
-                params={
-                    'sort': 'updated',  # Ordena por actualización (más recientes primero)
-                    'per_page': 100,    # Obtiene hasta 100 repos
-                    'type': 'owner'     # Solo repos que te pertenecen (no forks)
-                },
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                repos_data = response.json()
+            with cls._backend.refresh_lease(blocking=blocking) as leased:
+                if not leased:
+                    # Otro worker está consultando GitHub: su snapshot llegará por el backend
+                    return cls._cached_repos or []
                 
-                # Formatear los repos
-                formatted_repos = []
-                for repo in repos_data:
-                    # Obtener todos los lenguajes del repositorio
-                    languages = cls.get_repo_languages(repo['url'])
-                    
-                    # El lenguaje principal es el primero o "No especificado"
-                    primary_language = repo['language'] or 'No especificado'
-                    
-                    # Obtener lista de todos los lenguajes
-                    all_languages = list(languages.keys()) if languages else [primary_language]
-                    
-                    formatted_repo = {
-                        'id': repo['id'],
-                        'name': repo['name'],
-                        'description': repo['description'] or 'Sin descripción',
-                        'url': repo['html_url'],
-                        'language': primary_language,
-                        'languages': languages,  # Todos los lenguajes con porcentajes
-                        'all_languages_list': all_languages,  # Lista de todos los lenguajes
-                        'stars': repo['stargazers_count'],
-                        'updated_at': repo['updated_at'],
-                        'image_url': None,  # GitHub no proporciona imagen
-                        'github_url': repo['html_url'],
-                        'featured': False,  # Podrías marcar algunos como destacados
-                    }
-                    formatted_repos.append(formatted_repo)
+                # Otro hilo (u otro worker) pudo haber refrescado mientras tanto
+                cls._load_shared()
+                age = cls._cache_age()
+                if age is not None and age < cls._cache_duration:
+                    return cls._cached_repos
                 
-                # Guardar en caché
-                cls._cached_repos = formatted_repos
-                cls._cache_time = datetime.now()
+                if cls._circuit_is_open():
+                    return cls._cached_repos or []
                 
-                return formatted_repos
-            else:
-                return []
+                # Dejar margen en la cuota: la lista más una llamada por repo
+                # (con GraphQL basta una consulta, pero si falla se recurre a REST)
+                expected_calls = 1 + len(cls._cached_repos or [])
+                if not cls._quota_allows(expected_calls):
+                    print(f"Cuota de GitHub casi agotada ({cls._rate_remaining} restantes), se pospone el refresco")
+                    return cls._cached_repos or []
                 
-        except requests.exceptions.RequestException as e:
-            print(f"Error conectando a GitHub API: {e}")
-            # Si hay error, devolver caché anterior si existe
-            return cls._cached_repos if cls._cached_repos else []
+                repos = cls._fetch_repos()
+                if repos is None:
+                    cls._record_failure()
+                    return cls._cached_repos or []
+                
+                # Guardar en caché
+                cls._failures = 0
+                cls._circuit_open_until = None
+                cls._store(repos, changed=repos is not cls._cached_repos)
+                return repos
+        finally:
+            cls._refresh_lock.release()
+    
+    @classmethod
+    def _refresh_in_background(cls):
+        """Lanza un refresco en un hilo daemon si no hay otro en curso"""
+        if cls._refresh_lock.locked() or cls._circuit_is_open():
+            return
+        
+        thread = threading.Thread(
+            target=cls.refresh,
+            kwargs={'blocking': False},
+            name='github-refresh',
+            daemon=True
+        )
+        thread.start()
+    
+    @classmethod
+    def _cache_age(cls):
+        """Antigüedad del snapshot actual, o None si no hay"""
+        if cls._cached_repos is None or cls._cache_time is None:
+            return None
+        return datetime.now() - cls._cache_time
+    
+    @classmethod
+    def get_repos(cls):
+        """
+        Obtiene los repositorios de GitHub con caché.
+        
+        En modo stale-while-revalidate (por defecto) devuelve siempre el
+        último snapshot al instante y, pasado el TTL blando, lo renueva en
+        segundo plano. Solo se espera a GitHub si no hay snapshot o si éste
+        superó el TTL duro.
+        
+        Retorna:
+            list: Lista de diccionarios con info de cada repo
+        """
+        age = cls._cache_age()
+        
+        # Si el caché está fresco, devolverlo
+        if age is not None and age < cls._cache_duration:
+            return cls._cached_repos
+        
+        # Antes de ir a GitHub, ver si otro worker ya lo refrescó
+        cls._load_shared()
+        age = cls._cache_age()
+        if age is not None and age < cls._cache_duration:
+            return cls._cached_repos
+        
+        if cls.STALE_WHILE_REVALIDATE and age is not None and age < cls._cache_hard_duration:
+            cls._refresh_in_background()
+            return cls._cached_repos
+        
+        # Sin snapshot utilizable: refrescar en la petición
+        return cls.refresh()
+    
+    @classmethod
+    def get_snapshot(cls):
+        """
+        Repos, estadísticas y versión de un mismo snapshot con una sola
+        llamada a get_repos() (que puede esperar a GitHub si no hay snapshot).
+        
+        Retorna:
+            dict: {'repos', 'stats', 'version'}; sin snapshot, repos [] y version None
+        """
+        repos = cls.get_repos()
+        with cls._state_lock:
+            if cls._cached_repos is not None:
+                repos = cls._cached_repos
+            stats = cls._cached_stats if cls._cached_repos is not None else None
+            version = cls._cache_version
+        return {
+            'repos': repos,
+            'stats': stats if stats is not None else compute_language_stats(repos),
+            'version': version,
+        }
+    
+    @classmethod
+    def get_language_stats(cls):
+        """
+        Estadísticas de lenguajes del snapshot actual (calculadas al guardarlo).
+        
+        Retorna:
+            dict: Como compute_language_stats()
+        """
+        return cls.get_snapshot()['stats']
     
     @classmethod
     def clear_cache(cls):
         """Limpiar el caché manualmente (útil para desarrollo)"""
         cls._cached_repos = None
         cls._cache_time = None
+        cls._cache_version = None
+        cls._cached_stats = None
+        cls._failures = 0
+        cls._circuit_open_until = None
+        cls._validators = {}
@@ -0,0 +1,151 @@
+import json
+import time
+from datetime import datetime
+from sqlalchemy import func
+from app import db
+from app.github_service import GitHubService
+from app.language_stats import STATS_KEY, SYNC_KEY, compute_language_stats
+from app.models import CacheEntry, GitHubRepo, RepoLanguage
+
+def _parse_github_date(value):
+    """'2024-05-01T12:00:00Z' -> datetime UTC naive (como el resto de modelos)"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+def sync_github_repos():
+    """
+    Sincroniza los repos de GitHub con las tablas github_repo/repo_language.
+    
+    Es incremental: solo consulta /languages y actualiza los repos cuyo
+    updated_at o pushed_at cambió desde la última sincronización (con
+    GraphQL los lenguajes llegan con la lista y no hay consultas extra). Los repos
+    que ya no aparecen en GitHub se eliminan.
+    
+    Retorna:
+        dict: Contadores {'created', 'updated', 'unchanged', 'deleted', 'failed'},
+              o None si GitHub no respondió
+    """
+    # Con GraphQL la lista ya trae los lenguajes de todos los repos
+    repos_data = GitHubService.list_repos_graphql() if GitHubService.use_graphql() else None
+    try:
+        if repos_data is None:
+            repos_data, _ = GitHubService.list_repos()
+    except Exception as e:
+        print(f"Error conectando a GitHub API: {e}")
+        return None
+    
+    if repos_data is None:
+        return None
+    
+    stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'failed': 0}
+    existing = {repo.id: repo for repo in GitHubRepo.query.all()}
+    
+    # Detectar qué repos cambiaron desde la última sincronización
+    changed = []
+    for data in repos_data:
+        repo = existing.pop(data['id'], None)
+        if (repo is not None
+                and repo.updated_at == _parse_github_date(data['updated_at'])
+                and repo.pushed_at == _parse_github_date(data.get('pushed_at'))):
+            stats['unchanged'] += 1
+            continue
+        changed.append((repo, data))
+    
+    if repos_data and 'language_bytes' in repos_data[0]:
+        language_bytes = {data['id']: data['language_bytes'] for _, data in changed}
+    else:
+        # Lenguajes solo de los repos que cambiaron, en paralelo
+        deadline = time.monotonic() + GitHubService.REFRESH_DEADLINE
+        language_bytes = GitHubService._fetch_languages(
+            [data for _, data in changed],
+            deadline,
+            fetch=GitHubService.get_repo_language_bytes
+        )
+    
+    now = datetime.utcnow()
+    for repo, data in changed:
+        languages = language_bytes.get(data['id'])
+        if languages is None:
+            # Sin lenguajes no se marca como sincronizado: se reintenta la próxima vez
+            stats['failed'] += 1
+            continue
+        
+        if repo is None:
+            repo = GitHubRepo(id=data['id'])
+            db.session.add(repo)
+            stats['created'] += 1
+        else:
+            stats['updated'] += 1
+        
+        repo.name = data['name']
+        repo.description = data['description']
+        repo.html_url = data['html_url']
+        repo.language = data['language']
+        repo.stars = data['stargazers_count']
+        repo.updated_at = _parse_github_date(data['updated_at'])
+        repo.pushed_at = _parse_github_date(data.get('pushed_at'))
+        repo.synced_at = now
+        
+        percentages = GitHubService.language_percentages(languages)
+        repo.languages = [
+            RepoLanguage(language=lang, bytes=bytes_count, percentage=percentages[lang])
+            for lang, bytes_count in languages.items()
+        ]
+    
+    # Repos borrados o que dejaron de ser públicos
+    for repo in existing.values():
+        db.session.delete(repo)
+        stats['deleted'] += 1
+    
+    # Estadísticas de lenguajes en la misma transacción que los repos
+    if stats['created'] or stats['updated'] or stats['deleted'] or db.session.get(CacheEntry, STATS_KEY) is None:
+        db.session.flush()
+        store_language_stats(GitHubRepo.query.all())
+    
+    # Solo cuenta como sincronización completa si no quedó ningún repo pendiente
+    if not stats['failed']:
+        _store_last_sync(now)
+    
+    db.session.commit()
+    return stats
+
+def _store_last_sync(now):
+    entry = db.session.get(CacheEntry, SYNC_KEY)
+    if entry is None:
+        entry = CacheEntry(key=SYNC_KEY, version=0)
+        db.session.add(entry)
+    entry.payload = now.isoformat()
+    entry.updated_at = now
+    entry.version += 1
+
+def last_sync_time():
+    """
+    Hora (UTC) de la última sincronización completa.
+    
+    Las bases de datos sincronizadas antes de guardarla usan el synced_at
+    más reciente de los repos (None si nunca se sincronizó).
+    """
+    entry = db.session.get(CacheEntry, SYNC_KEY)
+    if entry is not None:
+        return entry.updated_at
+    return db.session.query(func.max(GitHubRepo.synced_at)).scalar()
+
+def store_language_stats(repos):
+    """Calcula y guarda en cache_entry las estadísticas de los repos sincronizados"""
+    language_stats = compute_language_stats([repo.to_dict() for repo in repos])
+    entry = db.session.get(CacheEntry, STATS_KEY)
+    if entry is None:
+        entry = CacheEntry(key=STATS_KEY, version=0)
+        db.session.add(entry)
+    entry.payload = json.dumps(language_stats, ensure_ascii=False)
+    entry.updated_at = datetime.utcnow()
+    entry.version += 1
+    return language_stats
+
+def load_language_stats():
+    """Estadísticas guardadas por la última sincronización (las calcula si no hay)"""
+    entry = db.session.get(CacheEntry, STATS_KEY)
+    if entry is not None:
+        return json.loads(entry.payload)
+    return compute_language_stats([repo.to_dict() for repo in GitHubRepo.query.all()])
@@ -0,0 +1,110 @@
+"""
+Caché HTTP: ETag/Last-Modified y respuestas 304 sin renderizar.
+
+El decorador conditional() calcula un validador barato (versiones de las
+tablas, updated_at de un post, versión del snapshot de GitHub...) ANTES de
+ejecutar la vista. Si el cliente ya tiene esa versión responde 304 sin
+consultar el resto de datos ni renderizar la plantilla. Con cache_tag, la
+respuesta además se guarda en el caché de páginas (app/page_cache.py)
+usando el ETag como clave.
+"""
+import hashlib
+import os
+from datetime import timezone
+from functools import wraps
+from flask import current_app, request
+from app.assets import assets
+from app.i18n import get_language
+from app.page_cache import page_cache
+
+# Cookies que cambian el HTML renderizado (además del idioma resuelto)
+VARIANT_COOKIES = ('theme',)
+
+def build_fingerprint(root=os.path.dirname(os.path.abspath(__file__))):
+    """
+    Hash del código, las plantillas y los catálogos de traducción de la app.
+    
+    Identifica el despliegue cuando el entorno no da uno (Heroku, local):
+    cambiar una plantilla o un .json de app/translations cambia los ETags.
+    """
+    digest = hashlib.sha1()
+    for directory, dirnames, filenames in os.walk(root):
+        # static/ ya cuenta con assets.version
+        dirnames[:] = sorted(name for name in dirnames if name not in ('__pycache__', 'static'))
+        for name in sorted(filenames):
+            if not name.endswith(('.py', '.html', '.json')):
+                continue
+            path = os.path.join(directory, name)
+            digest.update(os.path.relpath(path, root).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+# Identificador del despliegue: un deploy nuevo (plantillas nuevas) invalida los ETags
+APP_VERSION = os.environ.get('APP_VERSION') or os.environ.get('RENDER_GIT_COMMIT') or build_fingerprint()
+
+# Políticas de Cache-Control habituales
+NO_CACHE = 'no-cache'  # Siempre revalidar (barato gracias al 304)
+SHORT_CACHE = 'public, max-age=60, stale-while-revalidate=300'
+
+def _make_etag(validator):
+    # El idioma puede venir de la cookie o de Accept-Language: se usa el ya resuelto
+    variant = (get_language(),) + tuple(request.cookies.get(name, '') for name in VARIANT_COOKIES)
+    # Un build nuevo de los assets cambia las URLs versionadas que lleva el HTML
+    raw = repr((request.endpoint, request.full_path, variant, validator, APP_VERSION, assets.version)).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+def _as_utc(value):
+    """datetime naive (UTC, como en los modelos) -> aware, sin microsegundos"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+def conditional(validator, last_modified=None, cache_control=NO_CACHE, cache_tag=None):
+    """
+    Decorador para vistas GET cacheables.
+    
+    Args:
+        validator: función con los mismos argumentos que la vista; devuelve
+                   un valor que cambia cuando cambian los datos de la página
+        last_modified: función opcional que devuelve un datetime para Last-Modified
+        cache_control: valor de la cabecera Cache-Control
+        cache_tag: etiqueta para guardar la página renderizada en page_cache
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+            
+            etag = _make_etag(validator(*args, **kwargs))
+            modified = _as_utc(last_modified(*args, **kwargs)) if last_modified else None
+            
+            if _not_modified(etag, modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = page_cache.get(etag, cache_tag) if cache_tag else None
+                if response is None:
+                    response = current_app.make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    if cache_tag:
+                        page_cache.set(etag, cache_tag, response)
+            
+            # ETag débil: el cuerpo puede variar en bytes (p. ej. al comprimirlo)
+            response.set_etag(etag, weak=True)
+            if modified is not None:
+                response.last_modified = modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,129 @@
+"""
+Cliente HTTP compartido para las llamadas salientes (API de GitHub).
+
+Una requests.Session por proceso con un pool de conexiones keep-alive:
+tras la primera petición, las siguientes reutilizan la conexión TCP+TLS
+abierta en lugar de negociar una nueva cada vez.
+
+- Timeouts separados de conexión y de lectura.
+- Reintentos con backoff exponencial y jitter ante errores de red y 5xx.
+- Plazo total (budget) por llamada: reintentos y esperas incluidos, nunca
+  se pasa de él, así un refresco respeta GITHUB_REFRESH_DEADLINE.
+- Seguro con fork (gunicorn --preload): si el PID cambia, el proceso hijo
+  crea su propia sesión en vez de compartir sockets con el maestro.
+
+requests no habla HTTP/2; con keep-alive el handshake ya se paga una sola
+vez por conexión del pool, que es lo que dominaba el tiempo de refresco.
+"""
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from app.metrics import metrics
+
+# Respuestas que se reintentan (errores transitorios del servidor)
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+class HttpClient:
+    """Sesión con pool de conexiones, reintentos y plazo total; una por servicio"""
+    
+    def __init__(self, service, pool_size=8, connect_timeout=3.05, read_timeout=5,
+                 retries=2, backoff=0.25):
+        self.service = service  # Etiqueta de las métricas de llamadas externas
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff  # Segundos de la primera espera; se duplica en cada reintento
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """La sesión del proceso actual (se crea de nuevo tras un fork)"""
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    # La sesión heredada del maestro no se cierra: sus sockets siguen siendo suyos
+                    self._session = self._create_session()
+                    self._pid = os.getpid()
+        return self._session
+    
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _timeout(self, deadline):
+        """(conexión, lectura) recortados a lo que quede del plazo"""
+        if deadline is None:
+            return (self.connect_timeout, self.read_timeout)
+        remaining = max(deadline - time.monotonic(), 0.001)
+        return (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+    
+    def _wait_before_retry(self, attempt, deadline):
+        """
+        Espera con full jitter antes del reintento `attempt` (1, 2...).
+        
+        Retorna:
+            bool: False si la espera no cabe en el plazo (no reintentar)
+        """
+        delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+    
+    def request(self, method, url, budget=None, **kwargs):
+        """
+        Petición con reintentos ante errores de red y respuestas 5xx.
+        
+        Args:
+            budget: segundos totales para la llamada, reintentos incluidos
+                    (None: solo los timeouts de cada intento)
+        
+        Retorna:
+            requests.Response: la última respuesta (puede ser un 5xx si se
+                               agotaron los reintentos)
+        
+        Lanza:
+            requests.exceptions.RequestException si el último intento falló
+        """
+        deadline = time.monotonic() + budget if budget is not None else None
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=self._timeout(deadline), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                metrics.record_outbound(self.service, time.perf_counter() - started, error=True)
+                attempt += 1
+                if attempt > self.retries or not self._wait_before_retry(attempt, deadline):
+                    raise
+                continue
+            
+            retry = response.status_code in RETRY_STATUSES
+            metrics.record_outbound(self.service, time.perf_counter() - started, error=retry)
+            if not retry:
+                return response
+            attempt += 1
+            if attempt > self.retries or not self._wait_before_retry(attempt, deadline):
+                return response
+            response.close()
+    
+    def get(self, url, budget=None, **kwargs):
+        return self.request('GET', url, budget=budget, **kwargs)
+    
+    def post(self, url, budget=None, **kwargs):
+        return self.request('POST', url, budget=budget, **kwargs)
+    
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
@@ -0,0 +1,120 @@
+"""
+Internacionalización en el servidor.
+
+El idioma se resuelve en cada petición (cookie 'lang' o Accept-Language) y
+las plantillas se renderizan ya traducidas con t('seccion.clave'). Los
+catálogos viven en app/translations/<idioma>.json y se compilan una sola vez
+al arrancar: se aplanan a un dict 'seccion.clave' -> texto y las claves que
+faltan en un idioma se completan con el español.
+
+El contenido de la BD (experiencia, educación, categorías de skills) se
+traduce por tabla e id de fila con tc(fila, 'campo'), no por su texto.
+"""
+import hashlib
+import json
+import os
+from flask import g, request
+
+SUPPORTED_LANGUAGES = ('es', 'en', 'de', 'pt')
+DEFAULT_LANGUAGE = 'es'
+LANG_COOKIE = 'lang'
+
+CATALOG_DIR = os.path.join(os.path.dirname(__file__), 'translations')
+CONTENT_SECTION = 'contenido'
+
+# Secciones del catálogo que usa cada página (además de las comunes)
+COMMON_SECTIONS = ('navbar', 'footer')
+PAGE_SECTIONS = {
+    'index': ('hero', 'index'),
+    'proyectos': ('proyectos',),
+    'sobre_mi': ('sobre_mi',),
+    'contacto': ('contacto',),
+    'blog': ('blog',),
+    'admin': ('admin',),
+}
+
+_messages = {}   # idioma -> {'navbar.inicio': 'Inicio', ...}
+_content = {}    # idioma -> {tabla: {id: {campo: texto}}}
+catalog_version = ''
+
+def _flatten(tree, prefix=''):
+    flat = {}
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+def load_catalogs(directory=CATALOG_DIR):
+    """Lee y compila los catálogos de todos los idiomas soportados"""
+    global catalog_version
+    digest = hashlib.sha1()
+    raw = {}
+    
+    for lang in SUPPORTED_LANGUAGES:
+        with open(os.path.join(directory, f'{lang}.json'), 'rb') as f:
+            data = f.read()
+        digest.update(data)
+        raw[lang] = json.loads(data)
+    
+    base = _flatten({k: v for k, v in raw[DEFAULT_LANGUAGE].items() if k != CONTENT_SECTION})
+    for lang, catalog in raw.items():
+        _content[lang] = catalog.pop(CONTENT_SECTION, {})
+        messages = dict(base)
+        messages.update(_flatten(catalog))
+        _messages[lang] = messages
+    
+    catalog_version = digest.hexdigest()[:12]
+
+def get_language():
+    """Idioma de la petición actual: cookie, luego Accept-Language, luego español"""
+    lang = g.get('language')
+    if lang is None:
+        lang = request.cookies.get(LANG_COOKIE)
+        if lang not in SUPPORTED_LANGUAGES:
+            lang = request.accept_languages.best_match(SUPPORTED_LANGUAGES, default=DEFAULT_LANGUAGE)
+        g.language = lang
+    return lang
+
+def translate(key, lang=None):
+    """Texto de la clave 'seccion.clave' en el idioma actual (o la clave si no existe)"""
+    return _messages[lang or get_language()].get(key, key)
+
+def translate_content(row, field, lang=None):
+    """Campo de una fila de la BD en el idioma actual; si no hay traducción, el original"""
+    value = getattr(row, field)
+    lang = lang or get_language()
+    if lang == DEFAULT_LANGUAGE:
+        return value
+    table = _content[lang].get(row.__tablename__, {})
+    return table.get(str(row.id), {}).get(field, value)
+
+def page_catalog(lang, page):
+    """
+    Subconjunto del catálogo que necesita una página, para el JavaScript.
+    
+    Retorna:
+        dict: {'seccion.clave': texto} o None si la página no existe
+    """
+    if lang not in SUPPORTED_LANGUAGES or page not in PAGE_SECTIONS:
+        return None
+    prefixes = tuple(f'{section}.' for section in COMMON_SECTIONS + PAGE_SECTIONS[page])
+    return {key: text for key, text in _messages[lang].items() if key.startswith(prefixes)}
+
+def init_app(app):
+    load_catalogs()
+    app.jinja_env.globals.update(
+        t=translate,
+        tc=translate_content,
+        current_language=get_language,
+        supported_languages=SUPPORTED_LANGUAGES,
+    )
+    
+    @app.after_request
+    def vary_on_language(response):
+        # Las vistas cambian con el idioma: los cachés intermedios no deben mezclar variantes
+        if request.endpoint not in (None, 'static', 'asset'):
+            response.vary.add('Cookie')
+            response.vary.add('Accept-Language')
+        return response
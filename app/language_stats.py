@@ -0,0 +1,66 @@
+"""
+Estadísticas de lenguajes de los repos de GitHub.
+
+Se calculan una sola vez por snapshot (al refrescar desde la API o al
+ejecutar `flask sync-github`) y se guardan junto a él, así las páginas y
+/api/lenguajes no recorren todos los repos en cada petición:
+- repos: porcentaje de cada lenguaje dentro de cada repo
+- languages: reparto de todo el portfolio ponderado por bytes de código
+- technologies: lista ordenada de lenguajes para los filtros de proyectos
+"""
+
+STATS_KEY = 'github_language_stats'  # Clave en cache_entry para los repos sincronizados
+SYNC_KEY = 'github_last_sync'  # Clave en cache_entry con la hora de la última sincronización completa
+
+def language_percentages(language_bytes):
+    """Convierte {language: bytes} en {language: percentage}"""
+    if not language_bytes:
+        return {}
+    
+    # Calcular total de bytes
+    total_bytes = sum(language_bytes.values())
+    if not total_bytes:
+        return {lang: 0.0 for lang in language_bytes}
+    
+    # Calcular porcentajes
+    return {
+        lang: round((bytes_count / total_bytes) * 100, 1)
+        for lang, bytes_count in language_bytes.items()
+    }
+
+def compute_language_stats(repos):
+    """
+    Args:
+        repos: repos en el formato de GitHubService.get_repos() (con 'language_bytes')
+    
+    Retorna:
+        dict: {'total_bytes', 'languages', 'technologies', 'repos'}
+    """
+    totals = {}
+    repo_counts = {}
+    technologies = set()
+    per_repo = []
+    
+    for repo in repos:
+        language_bytes = repo.get('language_bytes') or {}
+        for lang, bytes_count in language_bytes.items():
+            totals[lang] = totals.get(lang, 0) + bytes_count
+            repo_counts[lang] = repo_counts.get(lang, 0) + 1
+        technologies.update(repo.get('all_languages_list') or [])
+        per_repo.append({
+            'id': repo['id'],
+            'name': repo['name'],
+            'languages': repo.get('languages') or language_percentages(language_bytes),
+        })
+    
+    percentages = language_percentages(totals)
+    languages = [
+        {'name': lang, 'bytes': bytes_count, 'percentage': percentages[lang], 'repos': repo_counts[lang]}
+        for lang, bytes_count in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    ]
+    return {
+        'total_bytes': sum(totals.values()),
+        'languages': languages,
+        'technologies': sorted(technologies),
+        'repos': per_repo,
+    }
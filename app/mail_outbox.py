@@ -0,0 +1,275 @@
+"""
+Cola de envío de los emails del formulario de contacto.
+
+ContactMessage hace de outbox durable: la vista solo guarda la fila con
+mail_status='pending' y responde. Los emails los envía un hilo en segundo
+plano (o `flask send-mail` si MAIL_OUTBOX_WORKER está desactivado):
+- reclama lotes con un UPDATE condicional, así dos workers nunca envían el
+  mismo mensaje; la reclamación es un lease (next_retry_at) y si el proceso
+  muere a medio envío la fila vuelve a la cola al vencer
+- envía cada lote por una sola conexión SMTP
+- guarda la entrega de cada email (aviso y confirmación) por separado: un
+  reintento no vuelve a enviar el que ya salió
+- reintenta con backoff exponencial y marca 'failed' tras MAIL_MAX_ATTEMPTS;
+  si se cae la conexión SMTP, el resto del lote vuelve a la cola sin gastar
+  un intento (no falló el mensaje)
+
+Con MAIL_SUPPRESS_SEND=true no se conecta a ningún servidor: los emails se
+imprimen en la consola (útil en desarrollo y pruebas).
+"""
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message, email_dispatched
+from sqlalchemy import and_, or_, update
+from app import db, mail
+from app.metrics import metrics
+from app.models import ContactMessage
+
+CONTACT_RECIPIENT = 'nnicolasnorato@gmail.com'
+
+LEASE_SECONDS = 120          # Tiempo máximo para enviar un lote antes de que otro lo reclame
+MAX_BACKOFF_SECONDS = 6 * 3600
+
+# Errores de la conexión, no del mensaje: se corta el lote y se reencola sin gastar intentos
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError)
+
+def build_messages(contact):
+    """
+    Email de aviso para el dueño del portfolio y confirmación para el remitente.
+    
+    Retorna:
+        list: (columna que registra la entrega, Message)
+    """
+    notification = Message(
+        subject=f'[Portfolio] {contact.subject}',
+        recipients=[CONTACT_RECIPIENT],
+        body=f"""
+Nuevo mensaje de contacto desde tu portfolio:
+
+Nombre: {contact.name}
+Email: {contact.email}
+Asunto: {contact.subject}
+
+Mensaje:
+{contact.message}
+
+---
+Responde directamente a: {contact.email}
+        """,
+        reply_to=contact.email
+    )
+    
+    confirmation = Message(
+        subject='Hemos recibido tu mensaje',
+        recipients=[contact.email],
+        body=f"""Hola {contact.name},
+
+Gracias por contactarme. He recibido tu mensaje y me pondré en contacto contigo pronto.
+
+Asunto: {contact.subject}
+
+Saludos,
+Nicolás Norato
+        """
+    )
+    return [('notified_at', notification), ('confirmed_at', confirmation)]
+
+def _due(now):
+    """Pendientes cuyo reintento venció, o reclamados cuyo lease expiró"""
+    return and_(
+        ContactMessage.mail_status.in_(('pending', 'sending')),
+        or_(ContactMessage.next_retry_at.is_(None), ContactMessage.next_retry_at <= now),
+    )
+
+def claim_batch(limit):
+    """
+    Reclama hasta `limit` mensajes para enviarlos.
+    
+    Retorna:
+        list: ContactMessage en estado 'sending', en orden de llegada
+    """
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    candidates = [row.id for row in db.session.query(ContactMessage.id)
+                  .filter(_due(now)).order_by(ContactMessage.id).limit(limit)]
+    
+    claimed = []
+    for contact_id in candidates:
+        # Condicional: si otro proceso lo reclamó entre medias, no afecta a ninguna fila
+        result = db.session.execute(
+            update(ContactMessage)
+            .where(ContactMessage.id == contact_id, _due(now))
+            .values(mail_status='sending', next_retry_at=lease_until)
+        )
+        if result.rowcount:
+            claimed.append(contact_id)
+    db.session.commit()
+    
+    if not claimed:
+        return []
+    return ContactMessage.query.filter(ContactMessage.id.in_(claimed)).order_by(ContactMessage.id).all()
+
+def _mark_sent(contact):
+    contact.mail_status = 'sent'
+    contact.mail_attempts = (contact.mail_attempts or 0) + 1
+    contact.sent_at = datetime.utcnow()
+    contact.next_retry_at = None
+    contact.last_error = None
+
+def _requeue(contact, error):
+    """Devuelve el mensaje a la cola sin contar un intento (se cayó la conexión)"""
+    contact.mail_status = 'pending'
+    contact.next_retry_at = datetime.utcnow() + timedelta(seconds=current_app.config['MAIL_RETRY_BASE'])
+    contact.last_error = str(error)[:1000]
+
+def _schedule_retry(contact, error):
+    """Programa otro intento con backoff exponencial; retorna el nuevo estado"""
+    config = current_app.config
+    contact.mail_attempts = (contact.mail_attempts or 0) + 1
+    contact.last_error = str(error)[:1000]
+    
+    if contact.mail_attempts >= config['MAIL_MAX_ATTEMPTS']:
+        contact.mail_status = 'failed'
+        contact.next_retry_at = None
+        print(f"❌ Email del mensaje {contact.id} descartado tras {contact.mail_attempts} intentos: {error}")
+    else:
+        delay = min(config['MAIL_RETRY_BASE'] * 2 ** (contact.mail_attempts - 1), MAX_BACKOFF_SECONDS)
+        contact.mail_status = 'pending'
+        contact.next_retry_at = datetime.utcnow() + timedelta(seconds=delay)
+        print(f"⚠️ Error al enviar email del mensaje {contact.id} (intento {contact.mail_attempts}), "
+              f"reintento en {delay}s: {error}")
+    return contact.mail_status
+
+def send_pending(batch_size=None):
+    """
+    Envía un lote de la cola por una sola conexión SMTP.
+    
+    Retorna:
+        dict: {'claimed', 'sent', 'retry', 'failed', 'requeued'}
+    """
+    contacts = claim_batch(batch_size or current_app.config['MAIL_BATCH_SIZE'])
+    stats = {'claimed': len(contacts), 'sent': 0, 'retry': 0, 'failed': 0, 'requeued': 0}
+    if not contacts:
+        return stats
+    
+    pending = list(contacts)
+    in_flight = False  # pending[0] ya empezó a enviarse por la conexión actual
+    try:
+        with mail.connect() as connection:
+            while pending:
+                contact = pending[0]
+                in_flight = True
+                started = time.perf_counter()
+                try:
+                    for field, message in build_messages(contact):
+                        if getattr(contact, field) is None:
+                            connection.send(message)
+                            setattr(contact, field, datetime.utcnow())
+                except CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    metrics.record_outbound('smtp', time.perf_counter() - started, error=True)
+                    status = _schedule_retry(contact, e)
+                    stats['retry' if status == 'pending' else 'failed'] += 1
+                else:
+                    metrics.record_outbound('smtp', time.perf_counter() - started)
+                    _mark_sent(contact)
+                    stats['sent'] += 1
+                # Un commit por mensaje: si el proceso muere, solo se reenvía el que estaba en curso
+                db.session.commit()
+                pending.pop(0)
+                in_flight = False
+    except CONNECTION_ERRORS as e:
+        # Conexión caída: se conserva lo ya entregado del mensaje en curso, que
+        # gasta un intento (si es él quien tumba la conexión acabará en
+        # 'failed' en vez de bloquear la cola); los que no llegaron a
+        # enviarse vuelven a la cola sin gastarlo
+        metrics.record_outbound('smtp', 0.0, error=True)
+        if in_flight:
+            status = _schedule_retry(pending[0], e)
+            stats['retry' if status == 'pending' else 'failed'] += 1
+        untried = pending[1:] if in_flight else pending
+        for contact in untried:
+            _requeue(contact, e)
+        stats['requeued'] = len(untried)
+        db.session.commit()
+        if untried:
+            print(f"⚠️ Conexión SMTP perdida, {len(untried)} mensajes vuelven a la cola: {e}")
+    except Exception as e:
+        # Falló la conexión (p. ej. autenticación): el resto del lote vuelve a la cola
+        metrics.record_outbound('smtp', 0.0, error=True)
+        db.session.rollback()
+        for contact in pending:
+            status = _schedule_retry(contact, e)
+            stats['retry' if status == 'pending' else 'failed'] += 1
+        db.session.commit()
+    
+    return stats
+
+class OutboxSender:
+    """
+    Hilo en segundo plano que vacía la cola.
+    
+    Se despierta con notify() (tras guardar un mensaje) y cada
+    MAIL_OUTBOX_INTERVAL segundos para los reintentos. Arranca en la primera
+    petición del proceso, así cada worker de gunicorn tiene el suyo tras el fork.
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.interval = 60
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+    
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config['MAIL_OUTBOX_WORKER']
+        self.interval = app.config['MAIL_OUTBOX_INTERVAL']
+        if self.enabled:
+            app.before_request(self.ensure_started)
+        if app.config.get('MAIL_SUPPRESS_SEND'):
+            email_dispatched.connect(_print_dispatched)
+    
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+                self._thread.start()
+    
+    def notify(self):
+        """Avisa al hilo de que hay mensajes nuevos en la cola"""
+        if self.enabled:
+            self.ensure_started()
+            self._wakeup.set()
+    
+    def _run(self):
+        batch_size = self.app.config['MAIL_BATCH_SIZE']
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    # Vaciar la cola mientras salgan lotes completos
+                    while True:
+                        stats = send_pending(batch_size)
+                        if stats['claimed'] < batch_size or stats['requeued']:
+                            break
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error en el envío de emails en segundo plano: {e}")
+
+def _print_dispatched(message, app):
+    """Sustituto local del SMTP con MAIL_SUPPRESS_SEND: muestra el email en la consola"""
+    print(f"📨 Email (no enviado): {message.subject} -> {', '.join(message.recipients)}")
+
+outbox_sender = OutboxSender()
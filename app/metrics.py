@@ -0,0 +1,412 @@
+"""
+Métricas por petición en formato Prometheus: GET /metrics.
+
+/metrics solo responde con METRICS_TOKEN definido (`Authorization: Bearer
+<token>`); sin él las métricas se recogen igual (y las peticiones lentas se
+registran) pero el endpoint da 404, así un despliegue nuevo no publica
+rutas, latencias ni errores.
+
+Por cada ruta (endpoint de Flask) se registra:
+- tiempo total de la petición y peticiones por código de estado
+- número de consultas SQL y su tiempo (eventos del motor de SQLAlchemy)
+- tiempo renderizando plantillas (señales de Flask)
+- tiempo de las llamadas salientes a GitHub y SMTP (record_outbound)
+
+Cada worker de gunicorn acumula en memoria y vuelca su estado cada
+METRICS_FLUSH_INTERVAL segundos a un archivo en METRICS_DIR; /metrics suma
+los archivos de todos los workers, así el resultado no depende de qué
+worker atienda el scrape. Los histogramas y contadores se pueden sumar sin
+perder información (buckets, _sum y _count son acumulados).
+
+Cada archivo se llama worker-<pid>-<arranque>.json: un PID reutilizado
+(reinicio del contenedor, reciclado de workers) no pisa el archivo de un
+worker muerto, así los totales nunca bajan (Prometheus lo tomaría como un
+reinicio del contador). Los archivos de procesos que ya no existen se suman
+a totals.json y se borran durante el scrape, con un lock de archivo para que
+dos workers no los sumen a la vez.
+
+Las peticiones más lentas que METRICS_SLOW_REQUEST_MS se registran en el log
+con el desglose (SQL, plantillas, GitHub, SMTP).
+"""
+import bisect
+import errno
+import glob
+import hmac
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from flask import Response, abort, current_app, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Sin fcntl (Windows) los archivos de workers muertos no se consolidan
+    fcntl = None
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+TOTALS_FILE = 'totals.json'  # Métricas sumadas de los workers que ya terminaron
+LOCK_FILE = '.fold.lock'
+
+class Registry:
+    """Contadores e histogramas con etiquetas, serializables para sumarlos entre workers"""
+    
+    def __init__(self):
+        self._metrics = {}  # nombre -> {'type', 'help', 'labels', 'buckets', 'series'}
+        self._lock = threading.Lock()
+    
+    def counter(self, name, help_text, labels):
+        self._metrics[name] = {'type': 'counter', 'help': help_text, 'labels': labels, 'series': {}}
+    
+    def histogram(self, name, help_text, labels, buckets=DURATION_BUCKETS):
+        self._metrics[name] = {
+            'type': 'histogram', 'help': help_text, 'labels': labels,
+            'buckets': list(buckets), 'series': {},
+        }
+    
+    def inc(self, name, labels, amount=1):
+        key = json.dumps(labels)
+        with self._lock:
+            series = self._metrics[name]['series']
+            series[key] = series.get(key, 0) + amount
+    
+    def observe(self, name, labels, value):
+        metric = self._metrics[name]
+        key = json.dumps(labels)
+        with self._lock:
+            series = metric['series'].get(key)
+            if series is None:
+                # Un contador por bucket (no acumulado) más el de +Inf
+                series = metric['series'][key] = {'counts': [0] * (len(metric['buckets']) + 1), 'sum': 0.0}
+            series['counts'][bisect.bisect_left(metric['buckets'], value)] += 1
+            series['sum'] += value
+    
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._metrics))
+
+def merge_snapshots(snapshots):
+    """Suma las métricas de varios workers"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, series={}))
+            for key, value in metric['series'].items():
+                if metric['type'] == 'counter':
+                    target['series'][key] = target['series'].get(key, 0) + value
+                    continue
+                current = target['series'].get(key)
+                if current is None:
+                    target['series'][key] = {'counts': list(value['counts']), 'sum': value['sum']}
+                elif len(current['counts']) == len(value['counts']):
+                    current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                    current['sum'] += value['sum']
+    return merged
+
+def _label_text(names, values, extra=()):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+def render_prometheus(metrics):
+    """Formato de texto de Prometheus (version 0.0.4)"""
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key in sorted(metric['series']):
+            values = json.loads(key)
+            series = metric['series'][key]
+            if metric['type'] == 'counter':
+                lines.append(f"{name}{_label_text(metric['labels'], values)} {series}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'] + ['+Inf'], series['counts']):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f"{name}_bucket{_label_text(metric['labels'], values, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(metric['labels'], values)} {series['sum']}")
+            lines.append(f"{name}_count{_label_text(metric['labels'], values)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # Otro proceso lo está reemplazando o ya lo borró
+
+def _write_json(directory, name, data):
+    """Escritura atómica: quien lee ve el archivo anterior o el nuevo, nunca uno a medias"""
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _worker_pid(path):
+    """worker-<pid>-<arranque>.json -> pid (None si el nombre no encaja)"""
+    parts = os.path.basename(path)[:-len('.json')].split('-')
+    return int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else None
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM  # Existe, pero es de otro usuario
+    return True
+
+def _load_totals(directory):
+    return _read_json(os.path.join(directory, TOTALS_FILE)) or {'folded': [], 'metrics': {}}
+
+def fold_dead_workers(directory):
+    """
+    Suma a totals.json los archivos de workers que ya no existen y los borra.
+    
+    totals.json guarda los nombres ya sumados: primero se escribe y después
+    se borran los archivos, así un scrape concurrente que todavía los lea
+    no los cuenta dos veces.
+    
+    Retorna:
+        int: archivos consolidados
+    """
+    if fcntl is None or not os.path.isdir(directory):
+        return 0
+    with open(os.path.join(directory, LOCK_FILE), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0  # Otro worker está consolidando
+        
+        totals = _load_totals(directory)
+        folded = set(totals['folded'])
+        dead = []
+        for path in glob.glob(os.path.join(directory, 'worker-*.json')):
+            name = os.path.basename(path)
+            pid = _worker_pid(path)
+            if name in folded or pid is None or pid == os.getpid() or _process_alive(pid):
+                continue
+            data = _read_json(path)
+            if data is not None:
+                dead.append((name, path, data))
+        if not dead:
+            return 0
+        
+        existing = {os.path.basename(path) for path in glob.glob(os.path.join(directory, 'worker-*.json'))}
+        _write_json(directory, TOTALS_FILE, {
+            # Los nombres ya borrados no hace falta recordarlos
+            'folded': sorted((folded & existing) | {name for name, _, _ in dead}),
+            'metrics': merge_snapshots([totals['metrics']] + [data for _, _, data in dead]),
+        })
+        for _, path, _ in dead:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(dead)
+
+def collect_directory(directory):
+    """Métricas de todos los workers de un directorio, vivos y terminados"""
+    # Primero los archivos y después los totales (ver fold_dead_workers)
+    snapshots = {}
+    for path in glob.glob(os.path.join(directory, 'worker-*.json')):
+        data = _read_json(path)
+        if data is not None:
+            snapshots[os.path.basename(path)] = data
+    totals = _load_totals(directory)
+    folded = set(totals['folded'])
+    return merge_snapshots([totals['metrics']] + [
+        data for name, data in snapshots.items() if name not in folded
+    ])
+
+class RequestStats:
+    """Desglose de una petición en curso (vive en g)"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_started = []
+        self.outbound = {}  # servicio -> (llamadas, segundos)
+
+def _current_stats():
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+class Metrics:
+    """Hooks de Flask/SQLAlchemy y el endpoint /metrics"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 5
+        self.slow_request_ms = 1000
+        self.slow_sample_rate = 1.0
+        self.registry = Registry()
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        self._worker_pid = None
+        self._worker_started = None
+        
+        r = self.registry
+        r.counter('portfolio_http_requests_total', 'Peticiones atendidas', ['route', 'method', 'status'])
+        r.histogram('portfolio_http_request_duration_seconds', 'Tiempo total de la petición', ['route', 'method'])
+        r.histogram('portfolio_db_queries_per_request', 'Consultas SQL por petición', ['route'], QUERY_COUNT_BUCKETS)
+        r.histogram('portfolio_db_seconds_per_request', 'Tiempo en consultas SQL por petición', ['route'])
+        r.histogram('portfolio_template_seconds_per_request', 'Tiempo renderizando plantillas por petición', ['route'])
+        r.histogram('portfolio_outbound_seconds_per_request',
+                    'Tiempo en llamadas a servicios externos por petición (solo las que llamaron)', ['route', 'service'])
+        r.histogram('portfolio_outbound_duration_seconds', 'Duración de cada llamada a un servicio externo', ['service'])
+        r.counter('portfolio_outbound_errors_total', 'Llamadas a servicios externos fallidas', ['service'])
+    
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config['METRICS_ENABLED']
+        if not self.enabled:
+            return
+        self.directory = config['METRICS_DIR'] or os.path.join(app.instance_path, 'metrics')
+        self.flush_interval = config['METRICS_FLUSH_INTERVAL']
+        self.slow_request_ms = config['METRICS_SLOW_REQUEST_MS']
+        self.slow_sample_rate = config['METRICS_SLOW_SAMPLE_RATE']
+        
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+        
+        from app import db
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+    
+    # ----- Hooks -----
+    
+    def _before_request(self):
+        g._request_stats = RequestStats()
+    
+    def _after_request(self, response):
+        stats = g.pop('_request_stats', None)
+        if stats is None or request.endpoint == 'metrics':
+            return response
+        
+        elapsed = time.perf_counter() - stats.started
+        route = request.endpoint or 'sin_ruta'
+        r = self.registry
+        r.inc('portfolio_http_requests_total', [route, request.method, str(response.status_code)])
+        r.observe('portfolio_http_request_duration_seconds', [route, request.method], elapsed)
+        r.observe('portfolio_db_queries_per_request', [route], stats.queries)
+        r.observe('portfolio_db_seconds_per_request', [route], stats.query_seconds)
+        r.observe('portfolio_template_seconds_per_request', [route], stats.template_seconds)
+        for service, (_, seconds) in stats.outbound.items():
+            r.observe('portfolio_outbound_seconds_per_request', [route, service], seconds)
+        
+        if elapsed * 1000 >= self.slow_request_ms and random.random() < self.slow_sample_rate:
+            self._log_slow(route, elapsed, response.status_code, stats)
+        
+        self.flush()
+        return response
+    
+    def _before_render(self, sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None:
+            stats.template_started.append(time.perf_counter())
+    
+    def _after_render(self, sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None and stats.template_started:
+            stats.template_seconds += time.perf_counter() - stats.template_started.pop()
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['_query_started'] = time.perf_counter()
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('_query_started', None)
+        stats = _current_stats()
+        if stats is not None and started is not None:
+            stats.queries += 1
+            stats.query_seconds += time.perf_counter() - started
+    
+    def record_outbound(self, service, seconds, error=False):
+        """Registra una llamada a un servicio externo ('github', 'smtp'), desde cualquier hilo"""
+        if not self.enabled:
+            return
+        self.registry.observe('portfolio_outbound_duration_seconds', [service], seconds)
+        if error:
+            self.registry.inc('portfolio_outbound_errors_total', [service])
+        stats = _current_stats()
+        if stats is not None:
+            calls, total = stats.outbound.get(service, (0, 0.0))
+            stats.outbound[service] = (calls + 1, total + seconds)
+    
+    def _log_slow(self, route, elapsed, status, stats):
+        outbound = ', '.join(
+            f"{service} {calls} llamadas {seconds * 1000:.0f} ms"
+            for service, (calls, seconds) in sorted(stats.outbound.items())
+        ) or 'sin llamadas externas'
+        print(
+            f"🐢 Petición lenta: {request.method} {request.full_path.rstrip('?')} ({route}) {status} "
+            f"{elapsed * 1000:.0f} ms | SQL {stats.queries} consultas {stats.query_seconds * 1000:.0f} ms | "
+            f"plantillas {stats.template_seconds * 1000:.0f} ms | {outbound}"
+        )
+    
+    # ----- Agregación entre workers -----
+    
+    def _worker_file_name(self):
+        pid = os.getpid()
+        if self._worker_pid != pid:
+            # Primer volcado de este proceso (o hijo recién creado por fork)
+            self._worker_pid = pid
+            self._worker_started = int(time.time() * 1000)
+        return f'worker-{pid}-{self._worker_started}.json'
+    
+    def flush(self, force=False):
+        """Vuelca las métricas de este worker a su archivo (como mucho cada flush_interval)"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            self._last_flush = now
+            try:
+                _write_json(self.directory, self._worker_file_name(), self.registry.snapshot())
+            except OSError as e:
+                print(f"Error guardando métricas: {e}")
+        finally:
+            self._flush_lock.release()
+    
+    def collect(self):
+        """Métricas de todos los workers (este incluido, al día)"""
+        self.flush(force=True)
+        try:
+            fold_dead_workers(self.directory)
+        except OSError as e:
+            print(f"Error consolidando métricas de workers terminados: {e}")
+        return collect_directory(self.directory)
+    
+    def view(self):
+        token = current_app.config['METRICS_TOKEN']
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+        return Response(render_prometheus(self.collect()), mimetype='text/plain; version=0.0.4')
+
+metrics = Metrics()
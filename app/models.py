@@ -16,6 +16,64 @@ class Project(db.Model):
     def __repr__(self):
         return f'<Project {self.title}>'
 
+class GitHubRepo(db.Model):
+    """Repositorio de GitHub sincronizado con `flask sync-github`"""
+    __tablename__ = 'github_repo'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # ID de GitHub
+    name = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text)
+    html_url = db.Column(db.String(300), nullable=False)
+    language = db.Column(db.String(100))  # Lenguaje principal según GitHub
+    stars = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, index=True)
+    pushed_at = db.Column(db.DateTime)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    languages = db.relationship(
+        'RepoLanguage',
+        backref='repo',
+        cascade='all, delete-orphan',
+        order_by='RepoLanguage.bytes.desc()',
+        lazy='selectin'
+    )
+    
+    def to_dict(self):
+        """Mismo formato que GitHubService.get_repos()"""
+        primary_language = self.language or 'No especificado'
+        languages = {lang.language: lang.percentage for lang in self.languages}
+        language_bytes = {lang.language: lang.bytes for lang in self.languages}
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description or 'Sin descripción',
+            'url': self.html_url,
+            'language': primary_language,
+            'languages': languages,
+            'language_bytes': language_bytes,
+            'all_languages_list': list(languages.keys()) if languages else [primary_language],
+            'stars': self.stars,
+            'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None,
+            'pushed_at': self.pushed_at.isoformat() + 'Z' if self.pushed_at else None,
+            'image_url': None,
+            'github_url': self.html_url,
+            'featured': False,
+        }
+    
+    def __repr__(self):
+        return f'<GitHubRepo {self.name}>'
+
+class RepoLanguage(db.Model):
+    """Bytes y porcentaje de un lenguaje dentro de un repo de GitHub"""
+    id = db.Column(db.Integer, primary_key=True)
+    repo_id = db.Column(db.Integer, db.ForeignKey('github_repo.id'), nullable=False, index=True)
+    language = db.Column(db.String(100), nullable=False, index=True)
+    bytes = db.Column(db.Integer, default=0)
+    percentage = db.Column(db.Float, default=0)
+    
+    def __repr__(self):
+        return f'<RepoLanguage {self.language} {self.percentage}%>'
+
 class Skill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(100), nullable=False)  # Backend, Frontend, Herramientas, etc
@@ -52,6 +110,11 @@ class Education(db.Model):
         return f'<Education {self.degree}>'
 
 class BlogPost(db.Model):
+    __table_args__ = (
+        # Paginación por cursor del listado (ver app/pagination.py)
+        db.Index('ix_blog_post_created_at_id', 'created_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -60,11 +123,24 @@ class BlogPost(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     order = db.Column(db.Integer, default=0)
     
+    # Markdown renderizado al guardar (ver app/blog_render.py)
+    rendered_html = db.Column(db.Text)
+    toc_html = db.Column(db.Text)
+    content_hash = db.Column(db.String(64))
+    
+    # Longitud calculada en SQL: el listado de admin no necesita cargar el contenido
+    content_length = db.column_property(db.func.length(content), deferred=True)
+    
     def __repr__(self):
         return f'<BlogPost {self.title}>'
 
 class ContactMessage(db.Model):
-    """Modelo para almacenar mensajes de contacto"""
+    """Modelo para almacenar mensajes de contacto (también es la cola de envío de emails)"""
+    __table_args__ = (
+        # Busca los pendientes de envío cuyo reintento ya venció (app/mail_outbox.py)
+        db.Index('ix_contact_message_mail_status_retry', 'mail_status', 'next_retry_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
     email = db.Column(db.String(150), nullable=False)
@@ -72,6 +148,49 @@ class ContactMessage(db.Model):
     message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read = db.Column(db.Boolean, default=False)
+    content_hash = db.Column(db.String(64), index=True)  # Detecta envíos repetidos del mismo mensaje
+    
+    # Envío de los emails: 'pending', 'sending', 'sent' o 'failed' (NULL en mensajes anteriores a la cola)
+    mail_status = db.Column(db.String(20), default='pending')
+    mail_attempts = db.Column(db.Integer, default=0)
+    next_retry_at = db.Column(db.DateTime)  # Próximo intento, o fin del lease mientras se envía
+    last_error = db.Column(db.Text)
+    sent_at = db.Column(db.DateTime)
+    # Entrega de cada email por separado: un reintento solo reenvía el que falta
+    notified_at = db.Column(db.DateTime)   # Aviso al dueño del portfolio
+    confirmed_at = db.Column(db.DateTime)  # Confirmación al remitente
     
     def __repr__(self):
         return f'<ContactMessage from {self.email}>'
+
+class CacheEntry(db.Model):
+    """Snapshot serializado compartido entre workers (p. ej. repos de GitHub)"""
+    key = db.Column(db.String(100), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CacheEntry {self.key} v{self.version}>'
+
+class RateLimitBucket(db.Model):
+    """Token bucket por ruta e IP, compartido entre workers (RATE_LIMIT_STORAGE=database)"""
+    __tablename__ = 'rate_limit_bucket'
+    
+    key = db.Column(db.String(200), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # Timestamp UNIX
+    
+    def __repr__(self):
+        return f'<RateLimitBucket {self.key} {self.tokens:.2f}>'
+
+class DataVersion(db.Model):
+    """Contador de cambios por tabla (ver app/data_versions.py)"""
+    __tablename__ = 'data_version'
+    
+    name = db.Column(db.String(100), primary_key=True)  # Nombre de la tabla
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.name} v{self.version}>'
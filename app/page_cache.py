@@ -0,0 +1,136 @@
+"""
+Caché de páginas renderizadas en el servidor.
+
+Guarda respuestas completas (cuerpo + cabeceras) en un LRU acotado en
+memoria y, opcionalmente, en un directorio compartido por todos los workers
+(PAGE_CACHE_DIR). La clave es el ETag que calcula http_cache.conditional(),
+que ya incluye ruta, argumentos, versión de los datos y la variante de
+idioma/tema, así que una entrada nunca sirve datos de otra versión.
+
+Cada entrada lleva una etiqueta ('blog', 'projects', 'about') para poder
+invalidar explícitamente: el CRUD del blog limpia 'blog', un refresco del
+snapshot de GitHub limpia 'projects' y un reseed de la BD limpia todo.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+# Cabeceras que no se guardan: las pone conditional() o son por cliente
+_SKIP_HEADERS = {'set-cookie', 'etag', 'cache-control', 'last-modified', 'content-length'}
+
+class FilePageStore:
+    """Entradas en archivos <dir>/<tag>/<key>: primera línea JSON con status y cabeceras, luego el cuerpo"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+    
+    def get(self, key, tag):
+        try:
+            with open(os.path.join(self.directory, tag, key), 'rb') as f:
+                meta = json.loads(f.readline())
+                return meta['status'], meta['headers'], f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def set(self, key, tag, entry):
+        status, headers, body = entry
+        tag_dir = os.path.join(self.directory, tag)
+        os.makedirs(tag_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tag_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps({'status': status, 'headers': headers}).encode('utf-8') + b'\n')
+                f.write(body)
+            os.replace(tmp_path, os.path.join(tag_dir, key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def invalidate(self, tag):
+        shutil.rmtree(os.path.join(self.directory, tag), ignore_errors=True)
+    
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for tag in os.listdir(self.directory):
+                self.invalidate(tag)
+
+class PageCache:
+    """LRU de respuestas en memoria con backend compartido opcional"""
+    
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.store = None
+        self._entries = OrderedDict()  # key -> (tag, (status, headers, body))
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        self.max_entries = app.config.get('PAGE_CACHE_SIZE', self.max_entries)
+        directory = app.config.get('PAGE_CACHE_DIR')
+        self.store = FilePageStore(directory) if directory else None
+    
+    def get(self, key, tag):
+        """Respuesta guardada para `key`, o None"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                self._entries.move_to_end(key)
+                return self._build_response(item[1])
+        
+        if self.store is not None:
+            entry = self.store.get(key, tag)
+            if entry is not None:
+                self._remember(key, tag, entry)
+                return self._build_response(entry)
+        return None
+    
+    def set(self, key, tag, response):
+        """Guarda una respuesta 200 sin cookies; devuelve False si no es cacheable"""
+        if response.status_code != 200 or 'Set-Cookie' in response.headers or response.is_streamed:
+            return False
+        
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name.lower() not in _SKIP_HEADERS]
+        entry = (response.status_code, headers, response.get_data())
+        self._remember(key, tag, entry)
+        
+        if self.store is not None:
+            try:
+                self.store.set(key, tag, entry)
+            except OSError as e:
+                print(f"Error guardando página en caché compartido: {e}")
+        return True
+    
+    def invalidate(self, *tags):
+        """Elimina todas las páginas con alguna de estas etiquetas"""
+        with self._lock:
+            for key in [key for key, (tag, _) in self._entries.items() if tag in tags]:
+                del self._entries[key]
+        if self.store is not None:
+            for tag in tags:
+                self.store.invalidate(tag)
+    
+    def clear(self):
+        """Elimina todas las páginas (p. ej. tras un reseed de la BD)"""
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+    
+    def _remember(self, key, tag, entry):
+        with self._lock:
+            self._entries[key] = (tag, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    @staticmethod
+    def _build_response(entry):
+        status, headers, body = entry
+        return current_app.response_class(body, status=status, headers=headers)
+
+page_cache = PageCache()
@@ -0,0 +1,54 @@
+"""
+Paginación por cursor (keyset) sobre (created_at, id).
+
+A diferencia de OFFSET, cada página es una búsqueda por índice a partir del
+último elemento visto, así que cuesta lo mismo en la página 1 que en la 100.
+El cursor es opaco para el cliente: base64 de "created_at|id".
+"""
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import tuple_
+
+def encode_cursor(created_at, item_id):
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Retorna:
+        tuple: (created_at, id), o None si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, item_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+def keyset_page(query, model, cursor=None, limit=10):
+    """
+    Página de `query` ordenada por (created_at, id) descendente.
+    
+    Args:
+        query: consulta base sobre `model` (con sus opciones de columnas)
+        cursor: cursor devuelto por la página anterior, o None para la primera
+    
+    Retorna:
+        tuple: (items, next_cursor) — next_cursor es None en la última página
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(*position))
+    
+    # Un elemento extra para saber si hay más páginas
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return items, next_cursor
@@ -0,0 +1,110 @@
+"""
+Índice en memoria para buscar y filtrar proyectos.
+
+Se construye una vez por versión de los datos (snapshot de GitHub + tabla
+project) y se reutiliza entre peticiones:
+- índice invertido de tokens (sin acentos ni mayúsculas) para la búsqueda
+- mapa tecnología -> ids de proyecto, así filtrar es una intersección
+"""
+import bisect
+import re
+import threading
+import unicodedata
+
+_TOKEN_RE = re.compile(r'[a-z0-9#+]+')
+
+def normalize(text):
+    """'Programación' -> 'programacion' (minúsculas y sin acentos)"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+class ProjectIndex:
+    """
+    Índice inmutable de una lista de proyectos (dicts como los de la API).
+    
+    Los ids internos son las posiciones en la lista original, que además
+    definen el orden por defecto de los resultados.
+    """
+    
+    def __init__(self, projects):
+        self.projects = projects
+        self._postings = {}
+        self._tech_map = {}
+        
+        for pid, project in enumerate(projects):
+            text = f"{project['title']} {project['description'] or ''}"
+            for token in tokenize(text):
+                self._postings.setdefault(token, set()).add(pid)
+            
+            for tech in project_technologies(project):
+                self._tech_map.setdefault(normalize(tech), set()).add(pid)
+        
+        # Tokens ordenados para resolver prefijos con búsqueda binaria
+        self._tokens = sorted(self._postings)
+    
+    def _match_prefix(self, prefix):
+        """Ids de los proyectos con algún token que empiece por `prefix`"""
+        ids = set()
+        start = bisect.bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self._postings[token]
+        return ids
+    
+    def search(self, query='', technology=''):
+        """
+        Proyectos que contienen todas las palabras de `query` (como prefijo)
+        y usan `technology`.
+        
+        Retorna:
+            list: Ids de proyecto en el orden original
+        """
+        candidates = None
+        
+        for token in tokenize(query):
+            matches = self._match_prefix(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        
+        if technology:
+            tech_ids = self._tech_map.get(normalize(technology.strip()), set())
+            candidates = tech_ids if candidates is None else candidates & tech_ids
+        
+        if candidates is None:
+            return list(range(len(self.projects)))
+        return sorted(candidates)
+
+def project_technologies(project):
+    """Tecnologías de un proyecto: las de la lista de la BD y los lenguajes de GitHub"""
+    techs = [tech.strip() for tech in str(project['technologies'] or '').split(',') if tech.strip()]
+    techs.extend(project.get('all_languages_list') or [])
+    return techs
+
+class ProjectIndexCache:
+    """Guarda el último ProjectIndex y lo reconstruye solo si cambia la clave de versión"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = (None, None)  # (key, index), se reemplaza de forma atómica
+    
+    def get(self, key, build_projects):
+        """
+        Args:
+            key: tupla de versiones de los datos de origen
+            build_projects: función sin argumentos que devuelve la lista de proyectos
+        """
+        cached_key, index = self._entry
+        if index is not None and cached_key == key:
+            return index
+        
+        with self._lock:
+            cached_key, index = self._entry
+            if index is None or cached_key != key:
+                index = ProjectIndex(build_projects())
+                self._entry = (key, index)
+            return index
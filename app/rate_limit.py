@@ -0,0 +1,159 @@
+"""
+Límite de peticiones por IP y ruta (token bucket).
+
+Cada pareja (ruta, IP) tiene un bucket de `limit` tokens que se rellena a
+razón de limit/period por segundo; cada petición gasta uno. Sin tokens se
+responde 429 con Retry-After. Los límites se configuran como 'N/segundos'
+(p. ej. RATE_LIMIT_CONTACT='5/600').
+
+Almacenamiento (RATE_LIMIT_STORAGE):
+- 'memory': dict del proceso; cada worker de gunicorn cuenta por separado
+- 'database': tabla rate_limit_bucket, compartida por todos los workers.
+  Se actualiza con compare-and-set sobre updated_at, sin bloqueos
+"""
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, make_response, render_template, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+def parse_limit(value):
+    """'5/600' -> (5, 600.0): 5 peticiones cada 600 segundos"""
+    count, period = str(value).split('/')
+    return int(count), float(period)
+
+def _refill(tokens, updated_at, now, rate, burst):
+    return min(burst, tokens + max(now - updated_at, 0) * rate)
+
+class MemoryStore:
+    """Buckets en memoria del proceso"""
+    
+    MAX_KEYS = 10000
+    
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at, full_at)
+        self._lock = threading.Lock()
+    
+    def consume(self, key, rate, burst, now):
+        """Gasta un token; retorna los segundos que faltan para tener uno (0 si se permitió)"""
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (burst, now, now))
+            tokens = _refill(tokens, updated_at, now, rate, burst)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            
+            if len(self._buckets) > self.MAX_KEYS:
+                # Un bucket lleno equivale a no tener entrada: se pueden borrar
+                for stale in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+                    del self._buckets[stale]
+            return wait
+
+class DatabaseStore:
+    """Buckets en la tabla rate_limit_bucket (compartidos entre workers)"""
+    
+    RETRIES = 5
+    PRUNE_AFTER = 86400  # Buckets sin uso en un día se borran al crear otros nuevos
+    
+    def consume(self, key, rate, burst, now):
+        from app import db
+        from app.models import RateLimitBucket
+        table = RateLimitBucket.__table__
+        
+        for _ in range(self.RETRIES):
+            try:
+                with db.engine.begin() as conn:
+                    row = conn.execute(
+                        select(table.c.tokens, table.c.updated_at).where(table.c.key == key)
+                    ).first()
+                    
+                    if row is None:
+                        conn.execute(delete(table).where(table.c.updated_at < now - self.PRUNE_AFTER))
+                        conn.execute(insert(table).values(key=key, tokens=burst - 1, updated_at=now))
+                        return 0
+                    
+                    tokens = _refill(row.tokens, row.updated_at, now, rate, burst)
+                    wait = 0 if tokens >= 1 else (1 - tokens) / rate
+                    # Solo se aplica si nadie modificó el bucket desde la lectura
+                    result = conn.execute(
+                        update(table)
+                        .where(table.c.key == key, table.c.updated_at == row.updated_at)
+                        .values(tokens=tokens - 1 if not wait else tokens, updated_at=now)
+                    )
+                    if result.rowcount:
+                        return wait
+            except IntegrityError:
+                pass  # Otro worker creó el bucket a la vez: reintentar
+        # Varias peticiones simultáneas de la misma IP a la misma ruta: se trata como ráfaga
+        return 1
+
+class RateLimiter:
+    """Limitador configurado desde la app; `rate_limit()` lo aplica a las vistas"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.store = MemoryStore()
+    
+    def init_app(self, app):
+        self.enabled = app.config['RATE_LIMIT_ENABLED']
+        storage = app.config['RATE_LIMIT_STORAGE']
+        if storage == 'memory':
+            self.store = MemoryStore()
+        elif storage == 'database':
+            self.store = DatabaseStore()
+        else:
+            raise ValueError(f"RATE_LIMIT_STORAGE desconocido: {storage}")
+    
+    def hit(self, key, limit):
+        """
+        Registra una petición para `key`.
+        
+        Retorna:
+            int: Segundos para reintentar (0 si la petición se permite)
+        """
+        if not self.enabled:
+            return 0
+        
+        count, period = parse_limit(limit)
+        try:
+            wait = self.store.consume(key, count / period, count, time.time())
+        except SQLAlchemyError as e:
+            # Si falla el almacén compartido se deja pasar: el formulario sigue funcionando
+            print(f"Error en el límite de peticiones: {e}")
+            return 0
+        return math.ceil(wait)
+
+limiter = RateLimiter()
+
+def rate_limit(config_key, methods=('POST',), template=None):
+    """
+    Decorador: limita la vista por IP según el valor de app.config[config_key].
+    
+    Args:
+        config_key: clave de configuración con el límite ('N/segundos')
+        methods: métodos HTTP que cuentan (por defecto solo POST)
+        template: plantilla para la respuesta 429 (si no, JSON)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method not in methods:
+                return f(*args, **kwargs)
+            
+            key = f"{request.endpoint}:{request.remote_addr}"
+            retry_after = limiter.hit(key, current_app.config[config_key])
+            if not retry_after:
+                return f(*args, **kwargs)
+            
+            message = f'Demasiados intentos. Intenta de nuevo en {retry_after} segundos.'
+            if template:
+                response = make_response(render_template(template, error=message), 429)
+            else:
+                response = make_response(jsonify({'error': message}), 429)
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        return decorated_function
+    return decorator
@@ -1,13 +1,28 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session, flash
-from app.models import Project, Skill, Experience, Education, BlogPost, ContactMessage
-from app import db, mail
+from flask import Blueprint, current_app, g, render_template, request, jsonify, redirect, url_for, session, flash
+from app.models import Project, Skill, Experience, Education, BlogPost, ContactMessage, GitHubRepo
+from app import db
 from app.github_service import GitHubService
-from flask_mail import Message
+from app.data_versions import get_version, get_versions
+from app.http_cache import conditional, SHORT_CACHE
+from app.page_cache import page_cache
+from app.project_index import ProjectIndexCache
+from app import blog_search, i18n
+from app.blog_render import RENDERER_VERSION, render_post
+from app.pagination import keyset_page
+from app.mail_outbox import outbox_sender
+from app.rate_limit import rate_limit
+from sqlalchemy.orm import defer, load_only
+from datetime import datetime, timedelta
+import hashlib
 import os
+import re
 from functools import wraps
 
 main_bp = Blueprint('main', __name__)
 
+# Índice de búsqueda de proyectos (uno por proceso)
+_project_index = ProjectIndexCache()
+
 # Contraseña para acceso al blog (guardada en .env o variable de entorno)
 BLOG_PASSWORD = os.getenv('BLOG_PASSWORD', 'nicolas2024')
 
@@ -20,13 +35,66 @@ def require_admin_auth(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def github_api_snapshot():
+    """
+    Snapshot de la API de GitHub para esta petición: se pide una sola vez.
+    
+    Sin snapshot, get_repos() espera a GitHub; si falla, el resultado vacío
+    se conserva hasta el final de la petición en lugar de esperar otra vez
+    en el validador, la vista y las estadísticas.
+    """
+    if '_github_snapshot' not in g:
+        g._github_snapshot = GitHubService.get_snapshot()
+    return g._github_snapshot
+
+def github_db_version():
+    """
+    Versión de las tablas de `flask sync-github` si se pueden usar, o 0.
+    
+    Sin ninguna sincronización, o si la última tiene más de
+    GITHUB_SYNC_MAX_AGE segundos (el cron dejó de ejecutarse), las páginas
+    vuelven a la API hasta la próxima sincronización. Se decide una vez por
+    petición para que el validador, la vista y las estadísticas coincidan.
+    """
+    if '_github_db_version' not in g:
+        version = get_version('github_repo')
+        max_age = current_app.config['GITHUB_SYNC_MAX_AGE']
+        if version and max_age:
+            from app.github_sync import last_sync_time
+            last_sync = last_sync_time()
+            if last_sync is None or datetime.utcnow() - last_sync > timedelta(seconds=max_age):
+                version = 0
+        g._github_db_version = version
+    return g._github_db_version
+
+def get_github_repos():
+    """
+    Repos de GitHub para las páginas de proyectos.
+    
+    Se leen de las tablas sincronizadas con `flask sync-github`; sin una
+    sincronización reciente se usa la API (GitHubService con caché).
+    """
+    if github_db_version():
+        repos = GitHubRepo.query.order_by(GitHubRepo.updated_at.desc()).all()
+        return [repo.to_dict() for repo in repos]
+    return github_api_snapshot()['repos']
+
+def get_language_stats():
+    """Estadísticas de lenguajes precalculadas con los mismos datos que get_github_repos()"""
+    if github_db_version():
+        from app.github_sync import load_language_stats
+        return load_language_stats()
+    return github_api_snapshot()['stats']
+
 @main_bp.route('/')
+@conditional(lambda: get_version('project'), cache_tag='projects')
 def index():
     """Página principal - Hero y presentación"""
     featured_projects = Project.query.filter_by(featured=True).order_by(Project.order).limit(3).all()
     return render_template('index.html', featured_projects=featured_projects)
 
 @main_bp.route('/proyectos')
+@conditional(lambda: github_repos_version(), cache_tag='projects')
 def proyectos():
     """
     Página de proyectos - Opción A (Híbrida)
@@ -38,18 +106,13 @@ def proyectos():
     Los repos de GitHub aparecen en primer plano.
     """
     # Obtener repos de GitHub
-    github_repos = GitHubService.get_repos()
+    github_repos = get_github_repos()
     
     # Convertir repos de GitHub a formato compatible con template
     projects = []
-    all_languages = set()  # Para recolectar todos los lenguajes
     
     # Agregar repos de GitHub
     for repo in github_repos:
-        # Recolectar todos los lenguajes del repo
-        if repo.get('all_languages_list'):
-            all_languages.update(repo['all_languages_list'])
-        
         projects.append({
             'title': repo['name'],
             'description': repo['description'],
@@ -64,12 +127,13 @@ def proyectos():
             'stars': repo['stars'],
         })
     
-    # Obtener tecnologías únicas para los filtros (TODOS los lenguajes)
-    technologies = sorted(list(all_languages))
+    # Tecnologías únicas para los filtros (TODOS los lenguajes), calculadas con el snapshot
+    technologies = get_language_stats()['technologies']
     
     return render_template('proyectos.html', projects=projects, technologies=technologies)
 
 @main_bp.route('/sobre-mi')
+@conditional(lambda: get_versions('skill', 'experience', 'education'), cache_tag='about')
 def sobre_mi():
     """Página de información personal"""
     skills_by_category = {}
@@ -88,7 +152,21 @@ def sobre_mi():
                          experiences=experiences,
                          educations=educations)
 
+def contact_content_hash(email, subject, message):
+    """Hash del contenido de un mensaje, sin distinguir mayúsculas ni espacios"""
+    normalized = '\n'.join(re.sub(r'\s+', ' ', value).strip().lower() for value in (email, subject, message))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def is_duplicate_contact(content_hash):
+    """True si ya llegó el mismo mensaje dentro de CONTACT_DEDUP_WINDOW"""
+    since = datetime.utcnow() - timedelta(seconds=current_app.config['CONTACT_DEDUP_WINDOW'])
+    return db.session.query(ContactMessage.id).filter(
+        ContactMessage.content_hash == content_hash,
+        ContactMessage.created_at >= since
+    ).first() is not None
+
 @main_bp.route('/contacto', methods=['GET', 'POST'])
+@rate_limit('RATE_LIMIT_CONTACT', template='contacto.html')
 def contacto():
     """Página de contacto"""
     if request.method == 'POST':
@@ -105,61 +183,30 @@ def contacto():
         if len(message) < 10:
             return render_template('contacto.html', error='El mensaje debe tener al menos 10 caracteres')
         
+        success = '¡Mensaje enviado exitosamente! Me pondré en contacto pronto.'
+        
         try:
+            # Reenvíos del mismo mensaje (doble clic, bots): se responde igual pero no se guarda ni se envía
+            content_hash = contact_content_hash(email, subject, message)
+            if is_duplicate_contact(content_hash):
+                print(f"♻️ Mensaje de contacto duplicado ignorado ({email})")
+                return render_template('contacto.html', success=success)
+            
             # Guardar en BD
             contact_msg = ContactMessage(
                 name=name,
                 email=email,
                 subject=subject,
-                message=message
+                message=message,
+                content_hash=content_hash
             )
             db.session.add(contact_msg)
             db.session.commit()
             
-            # Enviar email
-            try:
-                email_body = f"""
-Nuevo mensaje de contacto desde tu portfolio:
-
-Nombre: {name}
-Email: {email}
-Asunto: {subject}
-
-Mensaje:
-{message}
-
----
-Responde directamente a: {email}
-                """
-                
-                msg = Message(
-                    subject=f'[Portfolio] {subject}',
-                    recipients=['nnicolasnorato@gmail.com'],
-                    body=email_body,
-                    reply_to=email
-                )
-                mail.send(msg)
-                
-                # También enviar confirmación al usuario
-                confirmation_msg = Message(
-                    subject='Hemos recibido tu mensaje',
-                    recipients=[email],
-                    body=f"""Hola {name},
-
-Gracias por contactarme. He recibido tu mensaje y me pondré en contacto contigo pronto.
-
-Asunto: {subject}
-
-Saludos,
-Nicolás Norato
-                    """
-                )
-                mail.send(confirmation_msg)
-            except Exception as e:
-                print(f"Error al enviar email: {e}")
-                # Continuar aunque falle el email
+            # Los emails los envía la cola en segundo plano (app/mail_outbox.py)
+            outbox_sender.notify()
             
-            return render_template('contacto.html', success='¡Mensaje enviado exitosamente! Me pondré en contacto pronto.')
+            return render_template('contacto.html', success=success)
         
         except Exception as e:
             print(f"Error al procesar contacto: {e}")
@@ -168,6 +215,7 @@ Nicolás Norato
     return render_template('contacto.html')
 
 @main_bp.route('/admin-login', methods=['GET', 'POST'])
+@rate_limit('RATE_LIMIT_LOGIN', template='admin_login.html')
 def admin_login():
     """Login para acceder al panel de administración"""
     if request.method == 'POST':
@@ -179,12 +227,22 @@ def admin_login():
             return render_template('admin_login.html', error='Contraseña incorrecta')
     return render_template('admin_login.html')
 
+# Columnas que necesitan los listados del blog (el contenido completo no se carga)
+BLOG_LIST_COLUMNS = (BlogPost.id, BlogPost.title, BlogPost.summary, BlogPost.created_at, BlogPost.updated_at)
+BLOG_PAGE_SIZE = 10
+
+def get_blog_page(cursor=None, limit=BLOG_PAGE_SIZE, *extra_columns):
+    """Página del listado del blog por cursor, solo con las columnas del listado"""
+    query = BlogPost.query.options(load_only(*BLOG_LIST_COLUMNS, *extra_columns))
+    return keyset_page(query, BlogPost, cursor, limit)
+
 @main_bp.route('/admin')
 @require_admin_auth
 def admin_panel():
     """Panel de administración para crear/editar posts"""
-    posts = BlogPost.query.order_by(BlogPost.created_at.desc()).all()
-    return render_template('admin.html', posts=posts)
+    posts, next_cursor = get_blog_page(request.args.get('cursor'), 20, BlogPost.content_length)
+    return render_template('admin.html', posts=posts, next_cursor=next_cursor,
+                           total_posts=BlogPost.query.count())
 
 @main_bp.route('/admin/crear', methods=['GET', 'POST'])
 @require_admin_auth
@@ -204,8 +262,12 @@ def admin_crear_post():
             summary=summary,
             order=BlogPost.query.count() + 1
         )
+        render_post(post)
         db.session.add(post)
+        db.session.flush()  # Asigna el id para el índice de búsqueda
+        blog_search.index_post(post)
         db.session.commit()
+        page_cache.invalidate('blog')
         
         return redirect(url_for('main.admin_panel'))
     
@@ -225,7 +287,10 @@ def admin_editar_post(post_id):
         if not post.title or not post.content:
             return render_template('admin_edit.html', post=post, error='Título y contenido son requeridos')
         
+        render_post(post)
+        blog_search.index_post(post)
         db.session.commit()
+        page_cache.invalidate('blog')
         return redirect(url_for('main.admin_panel'))
     
     return render_template('admin_edit.html', post=post)
@@ -236,49 +301,122 @@ def admin_eliminar_post(post_id):
     """Eliminar post"""
     post = BlogPost.query.get_or_404(post_id)
     db.session.delete(post)
+    blog_search.remove_post(post_id)
     db.session.commit()
+    page_cache.invalidate('blog')
     return redirect(url_for('main.admin_panel'))
 
 @main_bp.route('/blog')
+@conditional(lambda: get_version('blog_post'), cache_tag='blog')
 def blog():
     """Blog público - cualquiera puede leer"""
-    posts = BlogPost.query.order_by(BlogPost.created_at.desc()).all()
-    return render_template('blog.html', posts=posts)
+    posts, next_cursor = get_blog_page(request.args.get('cursor'))
+    return render_template('blog.html', posts=posts, next_cursor=next_cursor)
+
+@main_bp.route('/api/blog')
+@conditional(lambda: get_version('blog_post'), cache_control=SHORT_CACHE)
+def api_blog():
+    """Siguiente página del blog (scroll infinito): datos y HTML de las tarjetas"""
+    limit = min(max(request.args.get('limit', BLOG_PAGE_SIZE, type=int), 1), 50)
+    posts, next_cursor = get_blog_page(request.args.get('cursor'), limit)
+    return jsonify({
+        'posts': [{
+            'id': post.id,
+            'title': post.title,
+            'summary': post.summary,
+            'created_at': post.created_at.isoformat() if post.created_at else None,
+            'updated_at': post.updated_at.isoformat() if post.updated_at else None,
+            'url': url_for('main.blog_post', post_id=post.id),
+        } for post in posts],
+        'html': render_template('_blog_cards.html', posts=posts),
+        'next_cursor': next_cursor,
+    })
+
+@main_bp.route('/i18n/<lang>/<page>.json')
+@conditional(lambda lang, page: i18n.catalog_version, cache_control='public, max-age=86400')
+def i18n_catalog(lang, page):
+    """Textos de una página en un idioma, para el JavaScript que los necesite"""
+    catalog = i18n.page_catalog(lang, page)
+    if catalog is None:
+        return jsonify({'error': 'Catálogo no encontrado'}), 404
+    return jsonify(catalog)
+
+def _blog_post_updated_at(post_id):
+    """Fecha de última modificación de un post (Last-Modified)"""
+    return db.session.query(BlogPost.updated_at).filter_by(id=post_id).scalar()
+
+def _blog_post_validator(post_id):
+    """
+    Validador de caché de un post: updated_at más el hash del contenido
+    renderizado. `flask render-posts` y el renderizado perezoso no tocan
+    updated_at, pero sí cambian content_hash (o dejan de tener el HTML pendiente).
+    """
+    row = db.session.query(
+        BlogPost.updated_at, BlogPost.content_hash, BlogPost.rendered_html.is_(None)
+    ).filter_by(id=post_id).first()
+    return (tuple(row) if row else None, RENDERER_VERSION)
 
 @main_bp.route('/blog/post/<int:post_id>')
+@conditional(_blog_post_validator, last_modified=_blog_post_updated_at, cache_tag='blog')
 def blog_post(post_id):
     """Ver post completo del blog - público"""
-    post = BlogPost.query.get_or_404(post_id)
+    post = BlogPost.query.options(defer(BlogPost.content)).filter_by(id=post_id).first_or_404()
+    
+    # Posts anteriores al renderizado en BD: se renderizan una vez y se guardan
+    if post.rendered_html is None:
+        render_post(post, touch=False)
+        db.session.commit()
+    
     return render_template('blog_post.html', post=post)
 
+@main_bp.route('/api/blog/search')
+@conditional(lambda: get_version('blog_post'), cache_control=SHORT_CACHE)
+def api_blog_search():
+    """Búsqueda en el blog: resultados por relevancia con fragmentos resaltados"""
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+    
+    total, results = blog_search.search_posts(query, page, per_page)
+    return jsonify({
+        'results': [{
+            'id': post.id,
+            'title': post.title,
+            'summary': post.summary,
+            'snippet': snippet,  # HTML escapado, coincidencias en <mark>
+            'created_at': post.created_at.isoformat() if post.created_at else None,
+            'url': url_for('main.blog_post', post_id=post.id),
+        } for post, snippet in results],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+    })
+
 @main_bp.route('/admin/logout')
 def admin_logout():
     """Logout del panel admin"""
     session.pop('admin_auth', None)
     return redirect(url_for('main.index'))
 
-@main_bp.route('/api/proyectos-filtrado')
-def api_proyectos_filtrado():
-    """API para obtener proyectos filtrados y buscados"""
-    search_query = request.args.get('search', '').lower().strip()
-    technology = request.args.get('tech', '').strip()
-    
-    # Obtener repos de GitHub
-    github_repos = GitHubService.get_repos()
+def _build_filter_projects():
+    """Lista combinada (repos de GitHub + proyectos destacados) para el índice de búsqueda"""
     projects = []
     
     # Convertir repos de GitHub
-    for repo in github_repos:
+    for repo in get_github_repos():
         projects.append({
             'title': repo['name'],
             'description': repo['description'],
             'technologies': repo['language'],
+            'all_languages_list': repo.get('all_languages_list', []),
             'github_url': repo['github_url'],
             'live_url': None,
             'image_url': repo['image_url'],
             'featured': False,
             'is_github': True,
             'stars': repo['stars'],
+            'updated_at': repo.get('updated_at'),
         })
     
     # Agregar proyectos de BD
@@ -293,26 +431,78 @@ def api_proyectos_filtrado():
             'image_url': project.image_url,
             'featured': True,
             'is_github': False,
+            'stars': 0,
+            'updated_at': project.created_at.isoformat() if project.created_at else None,
         })
     
-    # Filtrar por búsqueda
-    if search_query:
-        projects = [p for p in projects if 
-                   search_query in p['title'].lower() or 
-                   search_query in (p['description'] or '').lower()]
+    return projects
+
+def github_repos_version():
+    """Versión de los datos de GitHub: tablas sincronizadas o snapshot de la API"""
+    db_version = github_db_version()
+    if db_version:
+        return ('db', db_version)
+    # get_repos() mantiene vivo el refresco en segundo plano
+    return ('api', github_api_snapshot()['version'])
+
+def get_project_index():
+    """Índice de búsqueda de proyectos, reconstruido solo si cambian los datos"""
+    key = (github_repos_version(), get_version('project'))
+    return _project_index.get(key, _build_filter_projects)
+
+# Orden disponible en /api/proyectos-filtrado: clave -> función de ordenación
+PROJECT_SORT_KEYS = {
+    'title': lambda p: p['title'].lower(),
+    'stars': lambda p: p.get('stars') or 0,
+    'updated': lambda p: p.get('updated_at') or '',
+}
+
+@main_bp.route('/api/proyectos-filtrado')
+@conditional(lambda: (github_repos_version(), get_version('project')), cache_control=SHORT_CACHE)
+def api_proyectos_filtrado():
+    """
+    API para obtener proyectos filtrados y buscados.
+    
+    Parámetros: search, tech, sort (title|stars|updated), order (asc|desc),
+    page (desde 1) y per_page (máx. 100).
+    """
+    search_query = request.args.get('search', '').strip()
+    technology = request.args.get('tech', '').strip()
+    sort = request.args.get('sort', '')
+    descending = request.args.get('order', 'asc') == 'desc'
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    
+    index = get_project_index()
+    ids = index.search(search_query, technology)
+    projects = [index.projects[pid] for pid in ids]
     
-    # Filtrar por tecnología
-    if technology:
-        filtered = []
-        for p in projects:
-            techs = [tech.strip() for tech in str(p['technologies']).split(',')]
-            if technology in techs:
-                filtered.append(p)
-        projects = filtered
+    if sort in PROJECT_SORT_KEYS:
+        projects.sort(key=PROJECT_SORT_KEYS[sort], reverse=descending)
+    elif descending:
+        projects.reverse()
     
-    return jsonify(projects)
+    total = len(projects)
+    start = (page - 1) * per_page
+    return jsonify({
+        'projects': projects[start:start + per_page],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+    })
+
+@main_bp.route('/api/lenguajes')
+@conditional(lambda: github_repos_version(), cache_control=SHORT_CACHE)
+def api_lenguajes():
+    """
+    API con las estadísticas de lenguajes de los repos de GitHub: reparto del
+    portfolio ponderado por bytes, porcentajes por repo y lista de tecnologías.
+    """
+    return jsonify(get_language_stats())
 
 @main_bp.route('/api/proyectos')
+@conditional(lambda: get_version('project'), cache_control=SHORT_CACHE)
 def api_proyectos():
     """API para obtener proyectos en JSON"""
     projects = Project.query.order_by(Project.order).all()
@@ -328,6 +518,7 @@ def api_proyectos():
     } for p in projects])
 
 @main_bp.route('/api/habilidades')
+@conditional(lambda: get_version('skill'), cache_control=SHORT_CACHE)
 def api_habilidades():
     """API para obtener habilidades en JSON"""
     skills = Skill.query.order_by(Skill.category, Skill.order).all()
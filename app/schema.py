@@ -0,0 +1,43 @@
+"""
+Actualización ligera del esquema para bases de datos existentes.
+
+db.create_all() solo crea tablas nuevas: no agrega columnas ni índices a
+tablas que ya existen. upgrade_schema() compara los modelos con la base de
+datos y agrega lo que falte. Es idempotente y nunca borra nada.
+"""
+from sqlalchemy import inspect, text
+from app import db
+
+def upgrade_schema():
+    """
+    Agrega columnas e índices que falten en tablas existentes.
+    
+    Retorna:
+        list: Descripción de los cambios aplicados
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    changes = []
+    
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                # Las columnas nuevas se agregan como opcionales (SQLite no admite
+                # NOT NULL sin default en ALTER TABLE); el ORM pone los defaults
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                changes.append(f"{table.name}.{column.name}")
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn, checkfirst=True)
+                    changes.append(f"índice {index.name}")
+    
+    return changes
@@ -0,0 +1,96 @@
+"""
+Datos de ejemplo desde un único archivo: app/seed_data.json.
+
+Cada sección del JSON corresponde a un modelo y se carga con upsert por su
+clave natural (p. ej. categoría + nombre de una skill): las filas nuevas se
+insertan en bloque, las que cambiaron se actualizan en bloque por id y las
+iguales no se tocan. Todo ocurre en una sola transacción, así que recargar
+el contenido en producción es una operación rápida y atómica, y las filas
+existentes conservan su id (las traducciones de app/translations van por id).
+
+El orden de cada lista define la columna `order`.
+"""
+import json
+import os
+from sqlalchemy import insert, update
+from app import db
+from app.blog_render import content_hash, render_markdown
+from app.data_versions import bump_versions
+from app.models import BlogPost, Education, Experience, Project, Skill
+
+SEED_FILE = os.path.join(os.path.dirname(__file__), 'seed_data.json')
+
+# sección -> (modelo, clave natural)
+SECTIONS = {
+    'skills': (Skill, ('category', 'name')),
+    'experiences': (Experience, ('title', 'company')),
+    'educations': (Education, ('degree', 'institution')),
+    'projects': (Project, ('title',)),
+    'blog_posts': (BlogPost, ('title',)),
+}
+
+# Perfil: se carga en cualquier base de datos vacía. El resto son ejemplos (`flask init-db`)
+PROFILE_SECTIONS = ('skills', 'experiences', 'educations')
+
+def load_seed(path=SEED_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _blog_post_mapping(mapping, current):
+    """Los posts se guardan con su HTML ya renderizado; solo se renderiza si cambió el contenido"""
+    mapping['content_hash'] = content_hash(mapping['content'])
+    if current is not None and current.content_hash == mapping['content_hash'] and current.rendered_html is not None:
+        mapping['rendered_html'], mapping['toc_html'] = current.rendered_html, current.toc_html
+    else:
+        mapping['rendered_html'], mapping['toc_html'] = render_markdown(mapping['content'])
+    return mapping
+
+def _upsert_section(name, rows):
+    model, key_fields = SECTIONS[name]
+    existing = {tuple(getattr(obj, field) for field in key_fields): obj for obj in model.query.all()}
+    
+    inserts, updates = [], []
+    for position, row in enumerate(rows):
+        mapping = dict(row, order=position)
+        current = existing.get(tuple(mapping[field] for field in key_fields))
+        if model is BlogPost:
+            mapping = _blog_post_mapping(mapping, current)
+        
+        if current is None:
+            inserts.append(mapping)
+        elif any(getattr(current, field) != value for field, value in mapping.items()):
+            updates.append(dict(mapping, id=current.id))
+    
+    if inserts:
+        db.session.execute(insert(model), inserts)
+    if updates:
+        db.session.execute(update(model), updates)
+    return len(inserts), len(updates)
+
+def upsert_seed(sections=PROFILE_SECTIONS, data=None):
+    """
+    Carga las secciones indicadas del archivo de seed en una transacción.
+    
+    Retorna:
+        dict: {sección: (insertadas, actualizadas)}
+    """
+    data = load_seed() if data is None else data
+    stats = {}
+    try:
+        for name in sections:
+            stats[name] = _upsert_section(name, data.get(name, []))
+        
+        # Los inserts/updates en bloque no pasan por el flush del ORM
+        changed = [SECTIONS[name][0].__tablename__ for name, counts in stats.items() if any(counts)]
+        if changed:
+            bump_versions(db.session.connection(), changed)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    if stats.get('blog_posts', (0, 0)) != (0, 0):
+        from app import blog_search
+        blog_search.rebuild_index()
+        db.session.commit()
+    return stats
@@ -0,0 +1,43 @@
+"""
+Preparación de la base de datos: `flask setup-db`.
+
+Crear tablas, agregar columnas nuevas, cargar los datos de ejemplo y crear
+el índice de búsqueda se hace una sola vez por despliegue (fase release de
+Heroku, build de Render), no al arrancar cada worker de gunicorn: así el
+arranque no hace DDL ni consultas y los workers no compiten sobre una base
+de datos recién creada. Todos los pasos son idempotentes.
+"""
+from app import db
+from app.page_cache import page_cache
+
+def setup_database():
+    """Deja la base de datos lista para servir; se puede ejecutar en cada despliegue"""
+    from app import blog_search
+    from app.schema import upgrade_schema
+    
+    db.create_all()
+    # Agregar columnas/índices nuevos a tablas que ya existían
+    for change in upgrade_schema():
+        print(f'🔧 Esquema actualizado: {change}')
+    # Inicializar BD si está vacía
+    seed_if_empty()
+    # Índice de búsqueda del blog (FTS5 en SQLite)
+    blog_search.ensure_index()
+    # Páginas del despliegue anterior en PAGE_CACHE_DIR: sus claves ya no se usarán
+    page_cache.clear()
+    print('✅ Base de datos lista')
+
+def seed_if_empty():
+    """Inicializa la BD con los datos del perfil (app/seed_data.json) si está vacía"""
+    from app.models import Skill
+    from app.seed import upsert_seed
+    
+    # Verificar si ya hay datos
+    if Skill.query.first() is not None:
+        return False  # Ya hay datos, no inicializar
+    
+    print('⏳ Base de datos vacía. Inicializando con datos de ejemplo...')
+    upsert_seed()
+    page_cache.clear()
+    print('✅ Base de datos inicializada con datos de ejemplo')
+    return True
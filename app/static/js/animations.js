@@ -3,62 +3,62 @@
 // ===================================
 
 // Intersection Observer para animar elementos cuando entran en viewport
-const observerOptions = {
+const animationObserverOptions = {
     threshold: 0.1,
     rootMargin: '0px 0px -100px 0px'
 };
 
-const observer = new IntersectionObserver((entries) => {
+const animationObserver = new IntersectionObserver((entries) => {
     entries.forEach(entry => {
         if (entry.isIntersecting) {
             entry.target.classList.add('fade-in-up');
-            observer.unobserve(entry.target);
+            animationObserver.unobserve(entry.target);
         }
     });
-}, observerOptions);
+}, animationObserverOptions);
 
 // Elementos a animar
 document.addEventListener('DOMContentLoaded', () => {
     // Animar tarjetas de proyectos
     document.querySelectorAll('.project-card').forEach(card => {
         card.classList.add('animate-on-scroll');
-        observer.observe(card);
+        animationObserver.observe(card);
     });
 
     // Animar tarjetas de habilidades
     document.querySelectorAll('.skill-category').forEach(skill => {
         skill.classList.add('animate-on-scroll');
-        observer.observe(skill);
+        animationObserver.observe(skill);
     });
 
     // Animar items de experiencia
     document.querySelectorAll('.timeline-item').forEach(item => {
         item.classList.add('animate-on-scroll');
-        observer.observe(item);
+        animationObserver.observe(item);
     });
 
     // Animar tarjetas de educación
     document.querySelectorAll('.education-card').forEach(card => {
         card.classList.add('animate-on-scroll');
-        observer.observe(card);
+        animationObserver.observe(card);
     });
 
     // Animar items de contacto
     document.querySelectorAll('.contact-item').forEach(item => {
         item.classList.add('animate-on-scroll');
-        observer.observe(item);
+        animationObserver.observe(item);
     });
 
     // Animar iconos de tecnologías
     document.querySelectorAll('.tech-icon').forEach(icon => {
         icon.classList.add('animate-on-scroll');
-        observer.observe(icon);
+        animationObserver.observe(icon);
     });
 
     // Animar encabezados
     document.querySelectorAll('h2').forEach(h2 => {
         h2.classList.add('animate-on-scroll');
-        observer.observe(h2);
+        animationObserver.observe(h2);
     });
 
     // Smooth scroll para anclas
@@ -0,0 +1,62 @@
+"""
+Benchmark del arranque de un worker: importar la app y ejecutar create_app().
+
+Lanza N intérpretes nuevos (como gunicorn al arrancar cada worker) sobre una
+base de datos ya preparada y mide el tiempo hasta tener la app lista.
+
+Uso:
+    python benchmarks/boot_time.py [--runs 10] [--database-url sqlite:////tmp/bench.db]
+
+Imprime un JSON con la mediana, el mínimo y el máximo en milisegundos.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from app import create_app; create_app(); "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+def boot_once(env):
+    result = subprocess.run(
+        [sys.executable, '-c', BOOT_SNIPPET],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    # La última línea es el tiempo; las anteriores son los logs de la app
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database-url', help='Por defecto, un SQLite temporal preparado con setup-db')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(directory, 'boot.db')}"
+        env.setdefault('GITHUB_CACHE_FILE', os.path.join(directory, 'github_repos.json'))
+        
+        # Preparar la BD una vez, como en el despliegue (no cuenta en la medición)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'setup-db'],
+                       cwd=ROOT, env=env, capture_output=True, check=True)
+        boot_once(env)  # Calentar la caché de bytecode
+        
+        samples = [boot_once(env) for _ in range(args.runs)]
+    
+    print(json.dumps({
+        'runs': args.runs,
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de concurrencia de la base de datos: SQLite por defecto vs. ajustado.
+
+Simula varios workers de gunicorn (procesos) que leen el listado del blog y
+escriben mensajes de contacto a la vez sobre el mismo archivo SQLite, y
+compara el motor sin ajustes (rollback journal, synchronous=FULL) con los
+PRAGMAs de app/database.py (WAL, synchronous=NORMAL, busy_timeout, mmap).
+
+Uso:
+    python benchmarks/db_concurrency.py [--workers 4] [--seconds 5] [--write-ratio 0.2]
+
+Imprime un JSON con operaciones por segundo de lectura y escritura y los
+errores "database is locked" de cada configuración.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from app import db, database
+from app.models import BlogPost, ContactMessage
+
+TUNED_CONFIG = {
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_BUSY_TIMEOUT': 5000,
+    'SQLITE_MMAP_SIZE': 64 * 1024 * 1024,
+}
+
+def make_engine(uri, tuned):
+    engine = create_engine(uri)
+    if tuned:
+        database.configure_engine(engine, database.sqlite_pragmas(TUNED_CONFIG))
+    else:
+        # Valores por defecto de SQLite (el modo WAL queda guardado en el archivo)
+        database.configure_engine(engine, [('journal_mode', 'DELETE')])
+    return engine
+
+def prepare(uri, tuned, posts=200):
+    engine = make_engine(uri, tuned)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(BlogPost.__table__), [
+            {'title': f'Post {i}', 'summary': 'Resumen ' * 10, 'content': 'Contenido del post. ' * 200}
+            for i in range(posts)
+        ])
+    engine.dispose()
+
+def worker(uri, tuned, seconds, write_ratio, results):
+    engine = make_engine(uri, tuned)
+    blog = BlogPost.__table__
+    contact = ContactMessage.__table__
+    list_query = (select(blog.c.id, blog.c.title, blog.c.summary, blog.c.created_at)
+                  .order_by(blog.c.created_at.desc(), blog.c.id.desc()).limit(10))
+    stats = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = time.perf_counter() + seconds
+    
+    while time.perf_counter() < deadline:
+        try:
+            if random.random() < write_ratio:
+                with engine.begin() as conn:
+                    conn.execute(insert(contact).values(
+                        name='Bench', email='bench@example.com', subject='Benchmark',
+                        message='Mensaje de prueba ' * 20, mail_status='pending', mail_attempts=0
+                    ))
+                stats['writes'] += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(list_query).all()
+                stats['reads'] += 1
+        except OperationalError:
+            stats['errors'] += 1
+    
+    engine.dispose()
+    results.put(stats)
+
+def run(tuned, workers, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as directory:
+        uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        prepare(uri, tuned)
+        
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=worker, args=(uri, tuned, seconds, write_ratio, results))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        for _ in processes:
+            for key, value in results.get().items():
+                totals[key] += value
+        for process in processes:
+            process.join()
+    
+    return {
+        'reads_per_second': round(totals['reads'] / seconds, 1),
+        'writes_per_second': round(totals['writes'] / seconds, 1),
+        'locked_errors': totals['errors'],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+    
+    report = {
+        'workers': args.workers,
+        'seconds': args.seconds,
+        'write_ratio': args.write_ratio,
+        'default': run(False, args.workers, args.seconds, args.write_ratio),
+        'tuned': run(True, args.workers, args.seconds, args.write_ratio),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
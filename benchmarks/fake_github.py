@@ -0,0 +1,244 @@
+"""
+Servidor falso de la API de GitHub para benchmarks y pruebas locales.
+
+Responde a las rutas que usa GitHubService:
+    GET /users/<usuario>/repos          lista de repos (todos, sin paginar)
+    GET /repos/<usuario>/<repo>/languages  bytes por lenguaje
+    POST /graphql                       repos con lenguajes, de 100 en 100
+                                        (la consulta de GitHubService; exige token)
+
+Los datos son deterministas (misma semilla, mismos repos), cada respuesta
+lleva ETag y las peticiones con If-None-Match reciben 304, como en GitHub.
+La latencia simula la red: cada respuesta espera --latency ms (± --jitter),
+y --error-rate responde 502 a esa fracción de peticiones (GitHub caído a ratos).
+stats() cuenta también las conexiones TCP abiertas: con keep-alive son
+muchas menos que las peticiones.
+
+Uso:
+    python benchmarks/fake_github.py [--repos 100] [--latency 50] [--port 9000]
+    GITHUB_API_URL=http://127.0.0.1:9000 flask --app run sync-github
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+LANGUAGES = ['Python', 'JavaScript', 'C#', 'HTML', 'CSS', 'Java', 'TypeScript', 'Shell', 'ShaderLab', 'Dockerfile']
+
+def build_repos(count, base_url, username='NNorato123', seed=42):
+    """
+    Retorna:
+        tuple: (lista de repos como la API, {nombre: {lenguaje: bytes}})
+    """
+    rng = random.Random(seed)
+    updated = datetime(2024, 1, 1)
+    repos, languages = [], {}
+    for i in range(count):
+        name = f'repo-{i:04d}'
+        sizes = {
+            lang: rng.randint(1000, 400000)
+            for lang in rng.sample(LANGUAGES, rng.randint(1, 4))
+        }
+        # /languages de GitHub viene ordenado de mayor a menor
+        repo_languages = dict(sorted(sizes.items(), key=lambda item: -item[1]))
+        primary = max(repo_languages, key=repo_languages.get)
+        updated_at = (updated + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        repos.append({
+            'id': 100000 + i,
+            'name': name,
+            'description': f'Repositorio de prueba {i} con {", ".join(repo_languages)}',
+            'html_url': f'https://github.com/{username}/{name}',
+            'url': f'{base_url}/repos/{username}/{name}',
+            'language': primary,
+            'stargazers_count': rng.randint(0, 500),
+            'updated_at': updated_at,
+            'pushed_at': updated_at,
+        })
+        languages[name] = repo_languages
+    # GitHub ordena por actualización, los más recientes primero
+    repos.reverse()
+    return repos, languages
+
+class FakeGitHub:
+    """Estado del servidor: datos, latencia y contador de peticiones"""
+    
+    def __init__(self, repos=100, latency=0.0, jitter=0.0, username='NNorato123', error_rate=0.0):
+        self.repo_count = repos
+        self.latency = latency
+        self.jitter = jitter
+        self.username = username
+        self.error_rate = error_rate
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.repos, self.languages = [], {}
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def start(self, host='127.0.0.1', port=0):
+        """Arranca el servidor en un hilo; port=0 elige un puerto libre"""
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self.repos, self.languages = build_repos(self.repo_count, self.url, self.username)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-github', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'connections': self.connections,
+                'errors': self.errors,
+            }
+    
+    def _simulate_network(self):
+        """Cuenta la petición, espera la latencia y decide si falla (True: responder 502)"""
+        with self._lock:
+            self.requests += 1
+        if self.latency or self.jitter:
+            time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0) / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return True
+        return False
+    
+    def respond(self, path, if_none_match):
+        """Retorna (status, cuerpo, etag) para una ruta"""
+        if self._simulate_network():
+            return 502, b'{"message": "Server Error"}', None
+        
+        parts = urlsplit(path).path.strip('/').split('/')
+        if parts == ['users', self.username, 'repos']:
+            data = self.repos
+        elif len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'languages' and parts[2] in self.languages:
+            data = self.languages[parts[2]]
+        else:
+            return 404, b'{"message": "Not Found"}', None
+        
+        body = json.dumps(data).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if if_none_match == etag:
+            with self._lock:
+                self.not_modified += 1
+            return 304, b'', etag
+        return 200, body, etag
+    
+    def respond_graphql(self, body, authorization):
+        """Retorna (status, cuerpo) para la consulta de repos de GitHubService"""
+        if self._simulate_network():
+            return 502, b'{"message": "Server Error"}'
+        
+        if not authorization:
+            return 401, b'{"message": "This endpoint requires you to be authenticated."}'
+        try:
+            variables = json.loads(body or b'{}').get('variables') or {}
+        except ValueError:
+            return 400, b'{"message": "Problems parsing JSON"}'
+        if variables.get('login') != self.username:
+            data = {'data': {'user': None}, 'errors': [{'type': 'NOT_FOUND', 'message': 'Could not resolve to a User'}]}
+            return 200, json.dumps(data).encode('utf-8')
+        
+        # El cursor es la posición del último repo de la página anterior
+        start = int(variables['after']) + 1 if variables.get('after') else 0
+        page = self.repos[start:start + 100]
+        nodes = [{
+            'databaseId': repo['id'],
+            'name': repo['name'],
+            'description': repo['description'],
+            'url': repo['html_url'],
+            'stargazerCount': repo['stargazers_count'],
+            'updatedAt': repo['updated_at'],
+            'pushedAt': repo['pushed_at'],
+            'primaryLanguage': {'name': repo['language']},
+            'languages': {'edges': [
+                {'size': size, 'node': {'name': name}}
+                for name, size in self.languages[repo['name']].items()
+            ]},
+        } for repo in page]
+        end = start + len(page)
+        data = {'data': {'user': {'repositories': {
+            'pageInfo': {'hasNextPage': end < len(self.repos), 'endCursor': str(end - 1) if page else None},
+            'nodes': nodes,
+        }}}}
+        return 200, json.dumps(data).encode('utf-8')
+    
+    def _handler_class(self):
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+            
+            def do_GET(self):
+                status, body, etag = fake.respond(self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('X-RateLimit-Remaining', '5000')
+                self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_POST(self):
+                if urlsplit(self.path).path.rstrip('/') != '/graphql':
+                    status, body = 404, b'{"message": "Not Found"}'
+                else:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    status, body = fake.respond_graphql(self.rfile.read(length), self.headers.get('Authorization'))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Sin una línea por petición
+        
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=50, help='Milisegundos por respuesta')
+    parser.add_argument('--jitter', type=float, default=0, help='Variación aleatoria de la latencia (ms)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fracción de respuestas 502 (0 a 1)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    args = parser.parse_args()
+    
+    fake = FakeGitHub(args.repos, args.latency, args.jitter, error_rate=args.error_rate).start(args.host, args.port)
+    print(f'GitHub falso con {args.repos} repos en {fake.url} (GITHUB_API_URL={fake.url})')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+"""
+Prueba de carga de las rutas principales contra un GitHub falso.
+
+1. Arranca benchmarks/fake_github.py con --repos repos y --latency ms.
+2. Arranca la app (create_app) en otro proceso con un SQLite temporal
+   preparado con setup-db y todos los datos de ejemplo, apuntando
+   GITHUB_API_URL al servidor falso. Los emails no se envían y el límite
+   de peticiones está desactivado (se mediría el 429, no la ruta).
+3. Para cada ruta: una petición en frío (la primera de /proyectos espera a
+   GitHub) y después --concurrency clientes durante --seconds segundos.
+
+Con --server gunicorn la app corre bajo gunicorn (gunicorn.conf.py) con
+--worker-mode sync|gthread|gevent, y --slow-clients N añade N clientes que
+envían un POST a /contacto byte a byte durante toda la carga (móviles con
+mala red). Con workers sync cada uno de ellos retiene un worker entero;
+con gthread o gevent solo un hilo o un greenlet.
+
+Uso:
+    python benchmarks/load_test.py [--repos 100] [--latency 50] [--concurrency 8] [--seconds 10]
+    python benchmarks/load_test.py --output actual.json --baseline anterior.json --tolerance 0.2
+    python benchmarks/load_test.py --github-api graphql   # Refrescos por GraphQL (token falso)
+    python benchmarks/load_test.py --server gunicorn --worker-mode sync --slow-clients 2
+    python benchmarks/load_test.py --server gunicorn --worker-mode gthread --slow-clients 2
+
+Imprime un JSON con peticiones por segundo y latencias p50/p95/p99 (ms) por
+ruta. Con --baseline termina con código 1 si el p95 de alguna ruta empeora
+más de --tolerance respecto al JSON de referencia.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+from benchmarks.fake_github import FakeGitHub
+
+# nombre -> (método, ruta)
+ROUTES = {
+    'proyectos': ('GET', '/proyectos'),
+    'proyectos_filtrado': ('GET', '/api/proyectos-filtrado?search=repo&tech=python&sort=stars&order=desc'),
+    'sobre_mi': ('GET', '/sobre-mi'),
+    'blog': ('GET', '/blog'),
+    'contacto': ('GET', '/contacto'),
+    'contacto_post': ('POST', '/contacto'),
+}
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def prepare_database(env, quiet):
+    """Crea las tablas y carga todos los datos de ejemplo (en su propio proceso)"""
+    os.environ.update(env)
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+    
+    from app import create_app
+    from app.seed import SECTIONS, upsert_seed
+    from app.setup_db import setup_database
+    
+    app = create_app()
+    with app.app_context():
+        setup_database()
+        upsert_seed(SECTIONS)  # También proyectos y posts de ejemplo
+    return app
+
+def serve_app(port, env, quiet):
+    """Proceso del servidor: prepara la BD y sirve la app con el servidor de Werkzeug"""
+    app = prepare_database(env, quiet)
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    make_server('127.0.0.1', port, app, threaded=True, request_handler=QuietHandler).serve_forever()
+
+def start_gunicorn(port, env, args):
+    """Prepara la BD y arranca gunicorn con gunicorn.conf.py; retorna el Popen"""
+    preparer = multiprocessing.Process(target=prepare_database, args=(env, not args.verbose))
+    preparer.start()
+    preparer.join()
+    if preparer.exitcode != 0:
+        raise SystemExit('No se pudo preparar la base de datos')
+    
+    output = None if args.verbose else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+        cwd=ROOT,
+        env={
+            **os.environ, **env,
+            'GUNICORN_WORKER_MODE': args.worker_mode,
+            'WEB_CONCURRENCY': str(args.workers),
+            'GUNICORN_THREADS': str(args.threads),
+        },
+        stdout=output,
+        stderr=output,
+    )
+
+def wait_until_ready(base_url, is_alive, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not is_alive():
+            raise SystemExit('El servidor de la app terminó al arrancar')
+        try:
+            requests.get(f'{base_url}/', timeout=5)
+            return
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            time.sleep(0.1)
+    raise SystemExit('El servidor de la app no respondió a tiempo')
+
+def _request(session, base_url, method, path, counter):
+    if method == 'POST':
+        # Mensajes distintos: los repetidos se descartan como duplicados
+        n = next(counter)
+        return session.post(f'{base_url}{path}', data={
+            'name': 'Carga', 'email': f'carga{n}@example.com',
+            'subject': f'Mensaje {n}', 'message': f'Mensaje de prueba de carga número {n}',
+        }, timeout=30)
+    return session.get(f'{base_url}{path}', timeout=30)
+
+def slow_client(port, deadline, byte_interval):
+    """
+    Envía POSTs a /contacto de un byte en un byte hasta el deadline.
+    
+    Retorna:
+        int: peticiones lentas completadas
+    """
+    body = b'name=Lento&email=lento%40example.com&subject=Red+lenta&message=' + b'a' * 40
+    completed = 0
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=60) as sock:
+                sock.sendall(
+                    b'POST /contacto HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                    b'Content-Type: application/x-www-form-urlencoded\r\n'
+                    b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(body)
+                )
+                for i in range(len(body)):
+                    sock.sendall(body[i:i + 1])
+                    time.sleep(byte_interval)
+                sock.recv(1024)
+                completed += 1
+        except OSError:
+            time.sleep(0.1)
+    return completed
+
+def percentile(sorted_samples, pct):
+    """Percentil por interpolación lineal de una lista ya ordenada"""
+    if not sorted_samples:
+        return None
+    position = (len(sorted_samples) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+def run_route(base_url, method, path, concurrency, seconds, slow_clients=0, port=None, byte_interval=0.05):
+    """Carga sostenida sobre una ruta (con clientes lentos de fondo); retorna las métricas"""
+    counter = itertools.count()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    
+    with requests.Session() as session:
+        started = time.perf_counter()
+        cold = _request(session, base_url, method, path, counter)
+        cold_ms = (time.perf_counter() - started) * 1000
+        cold.close()
+    
+    deadline = time.monotonic() + seconds
+    
+    # Los clientes lentos empiezan antes para que ya ocupen el servidor
+    slow_threads = [
+        threading.Thread(target=slow_client, args=(port, deadline, byte_interval), daemon=True)
+        for _ in range(slow_clients)
+    ]
+    for thread in slow_threads:
+        thread.start()
+    time.sleep(min(byte_interval * 5, 1) if slow_clients else 0)
+    
+    def client():
+        local_latencies, local_errors = [], 0
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = _request(session, base_url, method, path, counter)
+                    ok = response.status_code < 400
+                    response.close()
+                except requests.exceptions.RequestException:
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                if ok:
+                    local_latencies.append(elapsed)
+                else:
+                    local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for thread in slow_threads:
+        thread.join()  # Terminar su último POST antes de la siguiente ruta
+    
+    latencies.sort()
+    return {
+        'method': method,
+        'path': path,
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'cold_ms': round(cold_ms, 2),
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+        'max_ms': round(latencies[-1], 2) if latencies else None,
+    }
+
+def regressions(result, baseline, tolerance):
+    """Rutas cuyo p95 empeoró más de `tolerance` (fracción) respecto a la referencia"""
+    found = []
+    for name, current in result['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if not previous or not previous.get('p95_ms') or current['p95_ms'] is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            found.append({'route': name, 'baseline_p95_ms': previous['p95_ms'], 'p95_ms': current['p95_ms']})
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=100, help='Repos del GitHub falso (10 a 1000)')
+    parser.add_argument('--latency', type=float, default=50, help='Latencia del GitHub falso (ms)')
+    parser.add_argument('--jitter', type=float, default=10, help='Variación de la latencia (ms)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10, help='Duración de la carga por ruta')
+    parser.add_argument('--routes', default=','.join(ROUTES), help=f'Separadas por comas: {", ".join(ROUTES)}')
+    parser.add_argument('--output', help='Guardar también el JSON en este archivo')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Empeoramiento del p95 permitido (0.2 = 20%%)')
+    parser.add_argument('--github-api', choices=('rest', 'graphql'), default='rest',
+                        help='API de GitHub para los refrescos (GITHUB_API_MODE)')
+    parser.add_argument('--server', choices=('werkzeug', 'gunicorn'), default='werkzeug')
+    parser.add_argument('--worker-mode', choices=('sync', 'gthread', 'gevent'), default='gthread',
+                        help='Con --server gunicorn: GUNICORN_WORKER_MODE')
+    parser.add_argument('--workers', type=int, default=2, help='Con --server gunicorn: WEB_CONCURRENCY')
+    parser.add_argument('--threads', type=int, default=8, help='Con --worker-mode gthread: GUNICORN_THREADS')
+    parser.add_argument('--slow-clients', type=int, default=0,
+                        help='Clientes que envían su POST byte a byte durante la carga')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar los logs de la app')
+    args = parser.parse_args()
+    
+    names = [name.strip() for name in args.routes.split(',') if name.strip()]
+    unknown = [name for name in names if name not in ROUTES]
+    if unknown:
+        parser.error(f'Rutas desconocidas: {", ".join(unknown)}')
+    
+    fake = FakeGitHub(args.repos, args.latency, args.jitter).start()
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'load.db')}",
+            'GITHUB_API_URL': fake.url,
+            # GraphQL solo se usa con token; el GitHub falso acepta cualquiera
+            'GITHUB_TOKEN': 'token-de-prueba' if args.github_api == 'graphql' else '',
+            'GITHUB_API_MODE': args.github_api,
+            'GITHUB_CACHE_FILE': os.path.join(directory, 'github_repos.json'),
+            'PAGE_CACHE_DIR': '',
+            'METRICS_DIR': os.path.join(directory, 'metrics'),  # No dejar archivos en instance/
+            'MAIL_SUPPRESS_SEND': 'true',
+            'RATE_LIMIT_ENABLED': 'false',
+        }
+        if args.server == 'gunicorn':
+            process = start_gunicorn(port, env, args)
+            is_alive = lambda: process.poll() is None
+        else:
+            process = multiprocessing.Process(target=serve_app, args=(port, env, not args.verbose), daemon=True)
+            process.start()
+            is_alive = process.is_alive
+        try:
+            wait_until_ready(base_url, is_alive)
+            routes = {
+                name: run_route(base_url, *ROUTES[name], args.concurrency, args.seconds,
+                                slow_clients=args.slow_clients, port=port)
+                for name in names
+            }
+        finally:
+            process.terminate()
+            if args.server == 'gunicorn':
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            else:
+                process.join()
+            fake.stop()
+    
+    result = {
+        'config': {
+            'repos': args.repos,
+            'latency_ms': args.latency,
+            'jitter_ms': args.jitter,
+            'concurrency': args.concurrency,
+            'github_api': args.github_api,
+            'server': args.server,
+            'worker_mode': args.worker_mode if args.server == 'gunicorn' else None,
+            'workers': args.workers if args.server == 'gunicorn' else 1,
+            'slow_clients': args.slow_clients,
+            'seconds': args.seconds,
+            'python': sys.version.split()[0],
+        },
+        'routes': routes,
+        'github': fake.stats(),
+    }
+    
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            result['regressions'] = regressions(result, json.load(f), args.tolerance)
+        exit_code = 1 if result['regressions'] else 0
+    
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Configuración de gunicorn (se carga sola al arrancar desde la raíz del proyecto).
+
+GUNICORN_WORKER_MODE elige cómo atiende peticiones cada worker:
+- gthread (por defecto): GUNICORN_THREADS hilos por worker. Una petición
+  que espera a GitHub, al SMTP o a un cliente lento bloquea su hilo, no el
+  worker entero.
+- gevent: greenlets cooperativos, hasta GUNICORN_WORKER_CONNECTIONS
+  peticiones por worker (requiere `pip install -r requirements-gevent.txt`).
+  El worker parchea la librería estándar, así que requests, smtplib y los
+  sleeps ceden el control mientras esperan la red. psycopg2 no coopera sin
+  psycogreen: con PostgreSQL mejor gthread. Ignora GUNICORN_PRELOAD: con
+  preload la app se importaría en el maestro antes del parcheo y sus locks
+  serían locks del sistema que bloquean el worker entero.
+- sync: una petición a la vez por worker (el modo anterior).
+
+El número de workers sigue siendo WEB_CONCURRENCY (1 por defecto).
+"""
+import os
+
+WORKER_MODES = ('sync', 'gthread', 'gevent')
+
+worker_mode = os.environ.get('GUNICORN_WORKER_MODE', 'gthread').lower()
+if worker_mode not in WORKER_MODES:
+    print(f"⚠️  GUNICORN_WORKER_MODE={worker_mode} no es válido ({', '.join(WORKER_MODES)}): se usa gthread")
+    worker_mode = 'gthread'
+if worker_mode == 'gevent':
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        print("⚠️  gevent no está instalado: se usa gthread")
+        worker_mode = 'gthread'
+
+worker_class = worker_mode
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8)) if worker_mode == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Con preload la app se crea una vez en el maestro y los workers la heredan
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+if preload_app and worker_mode == 'gevent':
+    print("⚠️  GUNICORN_PRELOAD no es compatible con gevent (la app se cargaría sin parchear): se desactiva")
+    preload_app = False
+
+def post_fork(server, worker):
+    """Cada worker abre sus propias conexiones a la BD (no comparte las del maestro)"""
+    if preload_app:
+        from wsgi import app
+        from app import db
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    """Último volcado de métricas: lo que contó el worker desde el anterior no se pierde"""
+    from app.metrics import metrics
+    if metrics.enabled:
+        metrics.flush(force=True)
+
+def when_ready(server):
+    detail = {
+        'gthread': f"{threads} hilos por worker",
+        'gevent': f"{worker_connections} conexiones por worker",
+        'sync': "una petición a la vez por worker",
+    }[worker_mode]
+    print(f"🦄 gunicorn en modo {worker_mode}: {workers} workers, {detail}")
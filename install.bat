@@ -13,7 +13,7 @@ pip install -r requirements.txt
 
 echo.
 echo [3] Inicializando base de datos...
-python -c "from run import app, db; app.app_context().push(); db.create_all(); print('✅ Base de datos creada')"
+python -m flask --app run setup-db
 
 echo.
 echo ====================================
@@ -2,14 +2,23 @@
 WSGI entry point para servidores de producción
 Compatible con: Gunicorn, uWSGI, etc.
 Usado por Render y otros hosting
+
+Solo crea la app: las tablas y los datos de ejemplo los prepara
+`flask --app run setup-db` una vez por despliegue (Procfile/render.yaml).
 """
 
-import os
+import time
+
+_boot_started = time.perf_counter()
+
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
-from run import app
+from app import create_app
 
 # Variable 'app' es lo que Render (y otros servidores) buscan
+app = create_app()
+
+print(f'🚀 App lista en {(time.perf_counter() - _boot_started) * 1000:.0f} ms')